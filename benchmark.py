@@ -0,0 +1,86 @@
+## @file benchmark.py
+# @brief Benchmarks the solver on seeded deals.
+
+import argparse
+import multiprocessing as mp
+import time
+import solver
+
+## @brief Times the solver on a set of deals.
+#
+# Both modes get the same budget per deal, since the node and time limits
+# cover the work of every worker together. The parallel mode reuses the same
+# worker processes for every deal, so their start up time is only counted
+# once.
+# @param seeds Array of deal seeds
+# @param workers Number of worker processes (1 for the single worker mode)
+# @param max_nodes Maximum number of states searched per solve
+# @param time_limit Maximum time in seconds per solve (None for no limit)
+# @return Array of (seed, solution length, nodes, seconds, workers used)
+# results
+def bench_solver(seeds, workers, max_nodes, time_limit=None):
+    results = []
+    game_solver = solver.Solver(max_nodes, time_limit)
+    try:
+        for seed in seeds:
+            state = solver.deal(seed)
+            start = time.perf_counter()
+            if workers == 1:
+                moves = game_solver.solve(state)
+            else:
+                moves = game_solver.solve_parallel(state, workers)
+            seconds = time.perf_counter() - start
+            length = None if moves is None else len(moves)
+            results.append((seed, length, game_solver.nodes, seconds,
+                            game_solver.workers))
+    finally:
+        game_solver.close()
+    return results
+
+## @brief Prints the parallel solver speedup versus the single worker mode.
+#
+# The parallel mode falls back to a serial solve for easy deals and on hosts
+# with fewer CPUs than requested workers, so the number of workers each deal
+# actually used is printed as well.
+# @param seeds Array of deal seeds
+# @param workers Number of worker processes for the parallel mode
+# @param max_nodes Maximum number of states searched per solve
+# @param time_limit Maximum time in seconds per solve (None for no limit)
+# @return None
+def report_speedup(seeds, workers, max_nodes, time_limit=None):
+    single = bench_solver(seeds, 1, max_nodes, time_limit)
+    parallel = bench_solver(seeds, workers, max_nodes, time_limit)
+    print('parallel mode requested %d workers' % workers)
+    print('seed  moves(1)  nodes(1)  time(1)  workers  moves(p)  nodes(p)'
+          '  time(p)  speedup')
+    total_single = 0
+    total_parallel = 0
+    for a in range(len(seeds)):
+        seed, single_length, single_nodes, single_time = single[a][:4]
+        parallel_length, parallel_nodes, parallel_time, used_workers = \
+            parallel[a][1:]
+        total_single += single_time
+        total_parallel += parallel_time
+        print('%4d  %8s  %8d  %7.2f  %7d  %8s  %8d  %7.2f  %7.2f'
+              % (seed, single_length, single_nodes, single_time,
+                 used_workers, parallel_length, parallel_nodes, parallel_time,
+                 single_time / max(parallel_time, 1e-9)))
+    print('total                     %7.2f                               '
+          '%7.2f  %7.2f'
+          % (total_single, total_parallel,
+             total_single / max(total_parallel, 1e-9)))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmarks the solver on seeded deals.')
+    parser.add_argument('--deals', type=int, default=20,
+                        help='number of seeded deals to solve')
+    parser.add_argument('--workers', type=int, default=mp.cpu_count(),
+                        help='number of worker processes')
+    parser.add_argument('--max-nodes', type=int, default=200000,
+                        help='maximum number of states searched per solve')
+    parser.add_argument('--time-limit', type=float, default=None,
+                        help='maximum time in seconds per solve')
+    args = parser.parse_args()
+    report_speedup(range(args.deals), args.workers, args.max_nodes,
+                   args.time_limit)
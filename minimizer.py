@@ -0,0 +1,153 @@
+## @file minimizer.py
+# @brief Shortens solver solutions.
+#
+# A solution is shortened by cutting out loops that return to an earlier
+# state (such as full stock cycles or moving cards back and forth), by
+# searching for shortcuts between states of the solution with iterative
+# deepening, and by dropping moves that aren't needed. Finally, the moves
+# after the point where every card can be auto-collected are merged into a
+# single collect move.
+
+import time
+import solver
+
+## @brief Shortens a winning move sequence.
+# @param state Game state the moves start from
+# @param moves Array of winning moves
+# @param time_limit Time budget in seconds
+# @param max_depth Maximum shortcut search depth
+# @return Array of winning moves that is no longer than the original
+def minimize(state, moves, time_limit=1.0, max_depth=3):
+    end_time = time.perf_counter() + time_limit
+    final_state = solver.replay(state, moves)
+    if final_state is None or not solver.is_won(final_state):
+        return list(moves)
+    moves = _remove_loops(state, moves)
+    depth = 1
+    while depth <= max_depth and time.perf_counter() < end_time:
+        length = len(moves)
+        moves = _prune_moves(state, moves, end_time)
+        moves = _remove_loops(state, moves)
+        moves = _find_shortcuts(state, moves, depth, end_time)
+        # Searches deeper once the current depth stops shortening the moves
+        if len(moves) == length:
+            depth += 1
+    return _merge_collect(state, moves)
+
+## @brief Gets the game states along a move sequence.
+# @param state Game state the moves start from
+# @param moves Array of moves
+# @return Array of game states, starting with the given state
+def _get_states(state, moves):
+    states = [state]
+    for move in moves:
+        states.append(solver.apply_move(states[-1], move))
+    return states
+
+## @brief Cuts out move sequences that return to an earlier state.
+# @param state Game state the moves start from
+# @param moves Array of winning moves
+# @return Array of winning moves without loops
+def _remove_loops(state, moves):
+    new_moves = []
+    states = [state]
+    # Index of each state in the new move sequence
+    state_idxs = {state: 0}
+    for move in moves:
+        new_state = solver.apply_move(states[-1], move)
+        if new_state in state_idxs:
+            # Going back to the earlier state
+            idx = state_idxs[new_state]
+            for old_state in states[idx + 1:]:
+                del state_idxs[old_state]
+            del new_moves[idx:]
+            del states[idx + 1:]
+        else:
+            new_moves.append(move)
+            states.append(new_state)
+            state_idxs[new_state] = len(states) - 1
+    return new_moves
+
+## @brief Drops single moves that the solution doesn't need.
+# @param state Game state the moves start from
+# @param moves Array of winning moves
+# @param end_time Time the search must stop at
+# @return Array of winning moves
+def _prune_moves(state, moves, end_time):
+    a = len(moves) - 1
+    while a >= 0 and time.perf_counter() < end_time:
+        trial = moves[:a] + moves[a + 1:]
+        final_state = solver.replay(state, trial)
+        if final_state is not None and solver.is_won(final_state):
+            moves = trial
+        a -= 1
+    return moves
+
+## @brief Gets every legal move from a state.
+# @param state Game state
+# @return Array of moves
+def _get_all_moves(state):
+    tableau, hidden, stock, stock_idx, found = state
+    moves = []
+    if stock:
+        moves.append((solver.STOCK, 0, 0, 0))
+    if stock_idx >= 0:
+        moves.append((solver.STOCK_TO_FOUND, 0, 0, 0))
+        for c in range(7):
+            moves.append((solver.STOCK_TO_TABLEAU, 0, 0, c))
+    for a in range(7):
+        if tableau[a]:
+            moves.append((solver.TABLEAU_TO_FOUND, a, len(tableau[a]) - 1, 0))
+        for b in range(hidden[a], len(tableau[a])):
+            for c in range(7):
+                moves.append((solver.TABLEAU_TO_TABLEAU, a, b, c))
+    return [move for move in moves if solver.is_legal(state, move)]
+
+## @brief Replaces parts of the solution with shorter paths between the same
+# states.
+# @param state Game state the moves start from
+# @param moves Array of winning moves
+# @param depth Maximum length of a shortcut
+# @param end_time Time the search must stop at
+# @return Array of winning moves
+def _find_shortcuts(state, moves, depth, end_time):
+    a = 0
+    while a < len(moves) and time.perf_counter() < end_time:
+        states = _get_states(state, moves)
+        # Last index of each state in the solution
+        state_idxs = {}
+        for b in range(len(states)):
+            state_idxs[states[b]] = b
+        # Breadth first search from the current state
+        frontier = [(states[a], [])]
+        shortcut = None
+        for c in range(depth):
+            next_frontier = []
+            for sub_state, path in frontier:
+                for move in _get_all_moves(sub_state):
+                    new_state = solver.apply_move(sub_state, move)
+                    new_path = path + [move]
+                    idx = state_idxs.get(new_state, -1)
+                    if idx - a > len(new_path):
+                        if shortcut is None or idx > shortcut[0]:
+                            shortcut = (idx, new_path)
+                    next_frontier.append((new_state, new_path))
+            if shortcut is not None:
+                break
+            frontier = next_frontier
+        if shortcut is not None:
+            moves = moves[:a] + shortcut[1] + moves[shortcut[0]:]
+        a += 1
+    return moves
+
+## @brief Merges the moves after every card can be auto-collected into a
+# single collect move.
+# @param state Game state the moves start from
+# @param moves Array of winning moves
+# @return Array of winning moves
+def _merge_collect(state, moves):
+    for a in range(len(moves)):
+        if solver.can_collect(state):
+            return moves[:a] + [(solver.COLLECT, 0, 0, 0)]
+        state = solver.apply_move(state, moves[a])
+    return moves
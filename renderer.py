@@ -0,0 +1,144 @@
+## @file renderer.py
+# @brief Renders board snapshots to image files without opening a window.
+#
+# Boards are drawn by offscreen games in a pool of worker processes, using
+# the same visuals as the game window. The images are written as PNG files
+# or packed into a single NumPy array file.
+
+import argparse
+import multiprocessing as mp
+import os
+import random as rnd
+import pygame
+import solitaire
+import solver
+
+## @brief Offscreen game of the worker process
+_game = None
+
+## @brief Creates the offscreen game of a worker process.
+# @return None
+def _init_worker():
+    global _game
+    # The dummy video driver never opens a window, and only applies to this
+    # worker process
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    _game = solitaire.Solitaire(offscreen = True)
+
+## @brief Renders a batch of states to PNG files (worker process target).
+# @param batch Array of (image index, state) pairs
+# @param output_dir Directory the PNG files are written to
+# @return Number of rendered images
+def _render_png_batch(batch, output_dir):
+    for idx, state in batch:
+        surface = _game.render_state(state)
+        pygame.image.save(surface, os.path.join(output_dir,
+                                                '%08d.png' % idx))
+    return len(batch)
+
+## @brief Renders a batch of states to RGB pixels (worker process target).
+# @param batch Array of (image index, state) pairs
+# @return Array of (image index, image size, RGB bytes) results
+def _render_raw_batch(batch):
+    pixels = []
+    for idx, state in batch:
+        surface = _game.render_state(state)
+        pixels.append((idx, surface.get_size(),
+                       pygame.image.tobytes(surface, 'RGB')))
+    return pixels
+
+## @brief Splits states into numbered batches.
+# @param states Array of game states
+# @param batch_size Number of states per batch
+# @return Array of batches of (image index, state) pairs
+def _get_batches(states, batch_size):
+    batches = []
+    for a in range(0, len(states), batch_size):
+        batches.append(list(enumerate(states[a:a + batch_size], a)))
+    return batches
+
+## @brief Renders states to PNG files named by the state index.
+# @param states Array of game states
+# @param output_dir Directory the PNG files are written to
+# @param workers Number of worker processes
+# @param batch_size Number of states rendered per task
+# @return None
+def render_png(states, output_dir, workers=None, batch_size=64):
+    os.makedirs(output_dir, exist_ok=True)
+    with mp.Pool(workers, initializer=_init_worker) as pool:
+        tasks = [(batch, output_dir)
+                 for batch in _get_batches(states, batch_size)]
+        pool.starmap(_render_png_batch, tasks)
+        # SDL catches the signal used to terminate the pool, so the workers
+        # have to stop on their own
+        pool.close()
+        pool.join()
+
+## @brief Renders states to a NumPy array file of shape
+# (states, height, width, 3).
+#
+# The file is written through a memory map, so the images never have to fit
+# in memory at once.
+# @param states Array of game states
+# @param path Path of the .npy file
+# @param workers Number of worker processes
+# @param batch_size Number of states rendered per task
+# @return None
+def render_npy(states, path, workers=None, batch_size=64):
+    # NumPy is only needed for this output format
+    import numpy as np
+    images = None
+    with mp.Pool(workers, initializer=_init_worker) as pool:
+        batches = _get_batches(states, batch_size)
+        for pixels in pool.imap_unordered(_render_raw_batch, batches):
+            for idx, size, data in pixels:
+                width, height = size
+                # Creating the file once the image size is known
+                if images is None:
+                    images = np.lib.format.open_memmap(
+                        path, mode='w+', dtype=np.uint8,
+                        shape=(len(states), height, width, 3))
+                images[idx] = np.frombuffer(data, dtype=np.uint8).reshape(
+                    height, width, 3)
+        pool.close()
+        pool.join()
+    if images is not None:
+        images.flush()
+
+## @brief Samples board states by playing random moves from seeded deals.
+# @param count Number of states
+# @param seed Random seed
+# @param max_moves Maximum number of random moves per state
+# @return Array of game states
+def sample_states(count, seed=0, max_moves=100):
+    random = rnd.Random(seed)
+    states = []
+    for a in range(count):
+        state = solver.deal(random.getrandbits(32))
+        for b in range(random.randint(0, max_moves)):
+            moves = solver.get_moves(state)
+            if not moves:
+                break
+            state = solver.apply_move(state, random.choice(moves))
+        states.append(state)
+    return states
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Renders board snapshots to image files.')
+    parser.add_argument('output',
+                        help='output directory (png) or file (npy)')
+    parser.add_argument('--count', type=int, default=1000,
+                        help='number of sampled board states')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='random seed of the sampled board states')
+    parser.add_argument('--format', choices=['png', 'npy'], default='png',
+                        help='output format')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='number of worker processes')
+    args = parser.parse_args()
+    sampled_states = sample_states(args.count, args.seed)
+    if args.format == 'png':
+        render_png(sampled_states, args.output, args.workers)
+    else:
+        render_npy(sampled_states, args.output, args.workers)
@@ -0,0 +1,60 @@
+## @file rules.py
+# @brief Precomputed lookup tables shared by all solitaire rule checks.
+#
+# Cards are identified by their index in the deck, where
+# index = suit * 13 + rank. This matches the order in which the game creates
+# its PlayingCard objects. The last column of each move table (index -1) is
+# used for an empty pile, so an empty pile can be looked up with the same -1
+# sentinel used throughout the game arrays.
+
+## @brief Number of suits in the deck
+SUIT_COUNT = 4
+## @brief Number of ranks per suit
+RANK_COUNT = 13
+## @brief Number of cards in the deck
+DECK_SIZE = SUIT_COUNT * RANK_COUNT
+## @brief Card index used for an empty pile
+EMPTY = -1
+
+## @brief Suit of each card index (club, spade, diamond, heart)
+CARD_SUITS = [idx // RANK_COUNT for idx in range(DECK_SIZE)]
+## @brief Rank of each card index (ace, 2-10, jack, queen, king)
+CARD_RANKS = [idx % RANK_COUNT for idx in range(DECK_SIZE)]
+## @brief Color of each card index (0 for black, 1 for red)
+CARD_COLORS = [1 if suit > 1 else 0 for suit in CARD_SUITS]
+
+## @brief Builds the tableau stacking table.
+# @return Array where entry [a][b] is true if card a can be placed on card b
+def _build_can_stack():
+    table = []
+    for a in range(DECK_SIZE):
+        row = []
+        for b in range(DECK_SIZE):
+            # Suits must be opposite colors and the rank must be in order
+            row.append(CARD_COLORS[a] != CARD_COLORS[b]
+                       and CARD_RANKS[b] - CARD_RANKS[a] == 1)
+        # Only a king can be placed on an empty tableau pile
+        row.append(CARD_RANKS[a] == RANK_COUNT - 1)
+        table.append(row)
+    return table
+
+## @brief Builds the foundation table.
+# @return Array where entry [a][b] is true if card a can be placed on a
+# foundation pile whose top card is b
+def _build_can_found():
+    table = []
+    for a in range(DECK_SIZE):
+        row = []
+        for b in range(DECK_SIZE):
+            # Suits must match and the rank must be in order
+            row.append(CARD_SUITS[a] == CARD_SUITS[b]
+                       and CARD_RANKS[a] - CARD_RANKS[b] == 1)
+        # Only an ace can be placed on an empty foundation pile
+        row.append(CARD_RANKS[a] == 0)
+        table.append(row)
+    return table
+
+## @brief Tableau stacking table indexed by [moving card][destination card]
+CAN_STACK = _build_can_stack()
+## @brief Foundation table indexed by [moving card][foundation top card]
+CAN_FOUND = _build_can_found()
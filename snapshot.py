@@ -0,0 +1,155 @@
+## @file snapshot.py
+# @brief Packs in-progress games into compact binary snapshots.
+#
+# A snapshot stores the card indices of the tableau and the stock in 6 bits
+# each. Flipped cards don't need to be stored, since they are always at the
+# top of a tableau column or in the hidden stock pile, and the foundation
+# cards follow from the suit and rank of each pile. A full game fits in at
+# most 60 bytes.
+
+import rules
+
+## @brief Current snapshot format version
+VERSION = 1
+
+## @class Snapshot
+# @brief Contains the state of an in-progress game.
+class Snapshot:
+    ## @return Snapshot object
+    def __init__(self):
+        ## @brief Array of card indices in each tableau column
+        # @hideinitializer
+        self.tableau = [[] for a in range(7)]
+        ## @brief Array of the number of flipped cards in each tableau column
+        # @hideinitializer
+        self.hidden = [0] * 7
+        ## @brief Array of card indices in the stock
+        # @hideinitializer
+        self.stock = []
+        ## @brief Current stock index
+        # @hideinitializer
+        self.stock_idx = -1
+        ## @brief Array of foundation suits
+        # @hideinitializer
+        self.found_suits = [-1] * 4
+        ## @brief Array of foundation ranks
+        # @hideinitializer
+        self.found_ranks = [-1] * 4
+        ## @brief Moves tracking variable
+        # @hideinitializer
+        self.moves = 0
+        ## @brief Score tracking variable
+        # @hideinitializer
+        self.score = 0
+        ## @brief Time tracking variable in seconds
+        # @hideinitializer
+        self.time = 0
+
+    ## @brief Gets the fields of the snapshot header.
+    # @return Array of (value, bit width) fields
+    def __get_header(self):
+        fields = [(VERSION, 8)]
+        for col in self.tableau:
+            fields.append((len(col), 5))
+        for count in self.hidden:
+            fields.append((count, 3))
+        fields.append((len(self.stock), 5))
+        fields.append((self.stock_idx + 1, 5))
+        for a in range(4):
+            fields.append((self.found_suits[a] + 1, 3))
+            fields.append((self.found_ranks[a] + 1, 4))
+        # Time is stored in tenths of a second
+        time = int(self.time * 10)
+        if not 0 <= self.moves <= 0xFFFF:
+            raise ValueError('Snapshot moves are out of range: '
+                             + str(self.moves))
+        if not -0x8000 <= self.score <= 0x7FFF:
+            raise ValueError('Snapshot score is out of range: '
+                             + str(self.score))
+        if not 0 <= time <= 0xFFFFFFFF:
+            raise ValueError('Snapshot time is out of range: '
+                             + str(self.time))
+        fields.append((self.moves, 16))
+        # The score is stored in two's complement
+        fields.append((self.score & 0xFFFF, 16))
+        fields.append((time, 32))
+        return fields
+
+    ## @brief Packs the snapshot into bytes.
+    # @return Snapshot bytes
+    def pack(self):
+        self.__check()
+        fields = self.__get_header()
+        for col in self.tableau:
+            for idx in col:
+                fields.append((idx, 6))
+        for idx in self.stock:
+            fields.append((idx, 6))
+        value = 0
+        width = 0
+        for field_value, field_width in fields:
+            value = (value << field_width) | field_value
+            width += field_width
+        # Padding the last byte so the fields can be read from the start
+        padding = -width % 8
+        return (value << padding).to_bytes((width + padding) // 8, 'big')
+
+    ## @brief Unpacks a snapshot from bytes.
+    # @param data Snapshot bytes
+    # @return Snapshot object
+    @staticmethod
+    def unpack(data):
+        value = int.from_bytes(data, 'big')
+        # Number of bits left to read
+        remaining = len(data) * 8
+
+        # Reads the next field from the snapshot bytes
+        def read(width):
+            nonlocal remaining
+            if width > remaining:
+                raise ValueError('Snapshot is truncated')
+            remaining -= width
+            return (value >> remaining) & ((1 << width) - 1)
+
+        version = read(8)
+        if version != VERSION:
+            raise ValueError('Unsupported snapshot version: ' + str(version))
+        snap = Snapshot()
+        lengths = [read(5) for a in range(7)]
+        snap.hidden = [read(3) for a in range(7)]
+        stock_length = read(5)
+        snap.stock_idx = read(5) - 1
+        for a in range(4):
+            snap.found_suits[a] = read(3) - 1
+            snap.found_ranks[a] = read(4) - 1
+        snap.moves = read(16)
+        snap.score = read(16)
+        if snap.score >= 0x8000:
+            snap.score -= 0x10000
+        snap.time = read(32) / 10
+        snap.tableau = [[read(6) for b in range(lengths[a])]
+                        for a in range(7)]
+        snap.stock = [read(6) for a in range(stock_length)]
+        snap.__check()
+        return snap
+
+    ## @brief Checks that the snapshot describes a valid game.
+    # @return None
+    def __check(self):
+        idxs = []
+        for col in self.tableau:
+            idxs.extend(col)
+        idxs.extend(self.stock)
+        for a in range(4):
+            if self.found_ranks[a] >= 0:
+                if self.found_suits[a] < 0 or self.found_suits[a] > 3:
+                    raise ValueError('Snapshot has an invalid foundation')
+                idxs.extend(self.found_suits[a] * rules.RANK_COUNT + b
+                            for b in range(self.found_ranks[a] + 1))
+        if sorted(idxs) != list(range(rules.DECK_SIZE)):
+            raise ValueError('Snapshot does not contain every card once')
+        for a in range(7):
+            if self.hidden[a] > max(len(self.tableau[a]) - 1, 0):
+                raise ValueError('Snapshot has an invalid tableau column')
+        if self.stock_idx >= len(self.stock):
+            raise ValueError('Snapshot has an invalid stock index')
@@ -10,17 +10,39 @@
 ## @file solitaire.py
 # @brief Implements a fully functional version of solitaire using pygame.
 
+import concurrent.futures as futures
+import os
 import pygame
 import random as rnd
-import copy
 import math
+import minimizer
+import multiprocessing as mp
+import rules
+import snapshot
+import solver
+
+## @brief Solves and shortens a game for the auto-play (worker process
+# target).
+# @param state Solver game state
+# @param solve_time Time budget in seconds for solving the game
+# @param minimize_time Time budget in seconds for shortening the moves
+# @return Packed moves, or None if no solution was found
+def _solve_autoplay(state, solve_time, minimize_time):
+    moves = solver.Solver(time_limit = solve_time).solve(state)
+    if moves is None:
+        return None
+    return solver.pack_moves(minimizer.minimize(state, moves,
+                                                minimize_time))
 
 ## @class Solitaire
 # @brief Contains methods and attributes used for running solitaire.
 class Solitaire:
-    ## @return Solitaire object
-    def __init__(self):
+    ## @param offscreen Draws to an offscreen surface instead of a window if
+    # true
+    # @return Solitaire object
+    def __init__(self, offscreen=False):
         pygame.init()
+        PlayingCard.clear_cache()
 
         ## @brief Screen background color
         # @hideinitializer
@@ -38,14 +60,6 @@ class Solitaire:
         ## @brief Card height in pixels
         # @hideinitializer
         self.__card_height = 84
-        ## @brief Array of card objects
-        # @hideinitializer
-        self.__cards = []
-        for a in range(4):
-            for b in range(13):
-                self.__cards.append(PlayingCard(a, b,
-                                       self.__card_width, self.__card_height))
-
         # Card width multiplier used for card horizontal spacing
         width_mult = 1.5
         # Card height multiplier used for card vertical spacing
@@ -76,8 +90,30 @@ class Solitaire:
         self.quit = False
         ## @brief Game screen object
         # @hideinitializer
-        self.__screen = pygame.display.set_mode((self.__screen_width,
-                                               self.__screen_height))
+        if offscreen:
+            self.__screen = pygame.Surface((self.__screen_width,
+                                            self.__screen_height))
+        else:
+            self.__screen = pygame.display.set_mode((self.__screen_width,
+                                                   self.__screen_height))
+        ## @brief Font used for the game UI
+        # @hideinitializer
+        self.__font = pygame.font.SysFont('Arial', 18)
+        self.__font.bold = True
+
+        ## @brief Array of card objects
+        # @hideinitializer
+        self.__cards = []
+        for a in range(4):
+            for b in range(13):
+                self.__cards.append(PlayingCard(a, b,
+                                       self.__card_width, self.__card_height))
+        ## @brief Layered sprite group that only redraws changed cards
+        # @hideinitializer
+        self.__sprites = pygame.sprite.LayeredDirty(self.__cards)
+        ## @brief Array of card layers when the cards are resting
+        # @hideinitializer
+        self.__card_layers = [0] * len(self.__cards)
 
         ## @brief Current selected card struct
         # @hideinitializer
@@ -187,6 +223,75 @@ class Solitaire:
         # @hideinitializer
         self.__win = False
 
+        ## @brief Array of card indices being dragged
+        # @hideinitializer
+        self.__drag_idxs = []
+        ## @brief Array of card offsets from the cursor while dragging
+        # @hideinitializer
+        self.__drag_offsets = []
+        ## @brief Cursor position where the drag started
+        # @hideinitializer
+        self.__drag_start = (0, 0)
+        ## @brief Current cursor position while dragging
+        # @hideinitializer
+        self.__drag_cursor = (0, 0)
+        ## @brief Cards follow the cursor if true
+        # @hideinitializer
+        self.__dragging = False
+        ## @brief Distance in pixels the cursor must move to start dragging
+        # @hideinitializer
+        self.__drag_threshold = 4
+        ## @brief Time in seconds between auto-collect moves
+        # @hideinitializer
+        self.__collect_delay = 0.1
+        ## @brief Time since the last auto-collect move
+        # @hideinitializer
+        self.__collect_time = 0
+        ## @brief Time budget in seconds for solving the game for the
+        # auto-play
+        # @hideinitializer
+        self.__solve_time = 2
+        ## @brief Time budget in seconds for shortening the auto-play moves
+        # @hideinitializer
+        self.__minimize_time = 0.5
+        ## @brief Array of solver moves left to auto-play
+        # @hideinitializer
+        self.__autoplay_moves = []
+        ## @brief Worker process the auto-play solves run in, so they don't
+        # block the frames (None until the first auto-play)
+        # @hideinitializer
+        self.__autoplay_executor = None
+        ## @brief Pending auto-play solve (None if there is none)
+        # @hideinitializer
+        self.__autoplay_future = None
+        ## @brief Solver game state the pending auto-play solve started from
+        # @hideinitializer
+        self.__autoplay_state = None
+        ## @brief Time in seconds between auto-play moves
+        # @hideinitializer
+        self.__autoplay_delay = 0.15
+        ## @brief Time since the last auto-play move
+        # @hideinitializer
+        self.__autoplay_time = 0
+        ## @brief Path of the file the game is saved to
+        # @hideinitializer
+        self.__save_path = 'solitaire.sav'
+
+        ## @brief Array of UI areas that are redrawn when the UI changes
+        # @hideinitializer
+        self.__gui_rects = [
+            pygame.Rect(0, 0, self.__screen_width,
+                        self.__window_margin - self.__pile_offset),
+            pygame.Rect(0, self.__screen_height - self.__window_margin,
+                        self.__screen_width, self.__window_margin)]
+        ## @brief UI text that is currently drawn
+        # @hideinitializer
+        self.__gui_text = None
+        ## @brief Background surface with the pile markers
+        # @hideinitializer
+        self.__background = pygame.Surface(self.__screen.get_size())
+        self.__draw_background()
+
         self.__reset_game()
 
     ## @brief Shuffles the cards and resets the game.
@@ -198,6 +303,11 @@ class Solitaire:
         self.__time = 0
         self.__win = False
         self.__clear_selected_cards()
+        self.__clear_drag()
+        self.__stop_autoplay()
+        # Catching any cards thrown by the win cascade
+        for card in self.__cards:
+            card.catch()
         # Resetting tableau index array
         for a in range(len(self.__tableau)):
             for b in range(len(self.__tableau[a])):
@@ -239,106 +349,138 @@ class Solitaire:
             for b in range(len(self.__tableau[a])):
                 idx = self.__tableau[a][b]
                 if idx != -1:
-                    self.__cards[idx].rect.x = self.__tableau_positions[a][b][0]
-                    self.__cards[idx].rect.y = self.__tableau_positions[a][b][1]
+                    self.__cards[idx].target = self.__tableau_positions[a][b]
+                    self.__card_layers[idx] = b
         # Getting stock card positions
         for a in range(len(self.__stock)):
             card = self.__cards[self.__stock[a]]
             # Reveal pile
             if a <= self.__stock_idx:
-                card.rect.x = self.__stock_rects[0].x + self.__pile_offset
-                card.rect.y = self.__stock_rects[0].y + self.__pile_offset
+                card.target = [self.__stock_rects[0].x + self.__pile_offset,
+                               self.__stock_rects[0].y + self.__pile_offset]
             # Hidden pile
             else:
-                card.rect.x = self.__stock_rects[1].x + self.__pile_offset
-                card.rect.y = self.__stock_rects[1].y + self.__pile_offset
+                card.target = [self.__stock_rects[1].x + self.__pile_offset,
+                               self.__stock_rects[1].y + self.__pile_offset]
+            self.__card_layers[self.__stock[a]] = a
         # Getting foundation card positions
         for a in range(len(self.__found_idxs)):
             for b in range(len(self.__found_idxs[a])):
                 idx = self.__found_idxs[a][b]
                 if idx >= 0:
                     card = self.__cards[idx]
-                    card.rect.x = self.__found_rects[a].x + self.__pile_offset
-                    card.rect.y = self.__found_rects[a].y + self.__pile_offset
+                    card.target = [self.__found_rects[a].x + self.__pile_offset,
+                                   self.__found_rects[a].y + self.__pile_offset]
+                    self.__card_layers[idx] = b
+        # Dragged cards follow the cursor
+        if self.__dragging:
+            for a in range(len(self.__drag_idxs)):
+                card = self.__cards[self.__drag_idxs[a]]
+                card.place(self.__drag_cursor[0] + self.__drag_offsets[a][0],
+                           self.__drag_cursor[1] + self.__drag_offsets[a][1])
 
-    ## @brief Draws the game as a whole.
+    ## @brief Moves the cards and keeps moving cards above resting cards.
+    # @param dt Time since the last update in seconds
     # @return None
-    def __draw_game(self):
+    def __update_sprites(self, dt):
+        for a in range(len(self.__cards)):
+            card = self.__cards[a]
+            card.update(dt)
+            layer = self.__card_layers[a]
+            # Thrown cards are drawn above everything else
+            if card.velocity is not None:
+                layer += 300
+            elif self.__dragging and a in self.__drag_idxs:
+                layer += 200
+            elif card.is_moving():
+                layer += 100
+            if layer != self.__sprites.get_layer_of_sprite(card):
+                self.__sprites.change_layer(card, layer)
+                card.dirty = 1
+
+    ## @brief Draws the background and the pile markers.
+    # @return None
+    def __draw_background(self):
+        self.__background.fill(self.__screen_color)
         # Drawing stock pile markers
         for rect in self.__stock_rects:
-            pygame.draw.rect(self.__screen, self.__pile_color, rect, width = 0)
-        # Drawing stock cards
-        for idx in self.__stock:
-            card = self.__cards[idx]
-            card.draw_card(self.__screen)
+            pygame.draw.rect(self.__background, self.__pile_color, rect,
+                             width = 0)
         # Drawing foundation pile markers
         for rect in self.__found_rects:
-            pygame.draw.rect(self.__screen, self.__pile_color, rect, width = 0)
-        # Drawing foundation cards
-        for idxs in self.__found_idxs:
-            for idx in idxs:
-                if idx >= 0:
-                    card = self.__cards[idx]
-                    card.draw_card(self.__screen)
+            pygame.draw.rect(self.__background, self.__pile_color, rect,
+                             width = 0)
         # Drawing tableau pile markers
         for rect in self.__tableau_rects:
-            pygame.draw.rect(self.__screen, self.__pile_color, rect, width=0)
-        # Drawing tableau
-        for col in self.__tableau:
-            for idx in col:
-                if idx >= 0:
-                    card = self.__cards[idx]
-                    card.draw_card(self.__screen)
+            pygame.draw.rect(self.__background, self.__pile_color, rect,
+                             width = 0)
+        self.__gui_text = None
+        self.__sprites.repaint_rect(self.__screen.get_rect())
+
+    ## @brief Draws the game as a whole.
+    # @return Array of screen areas that were redrawn
+    def __draw_game(self):
+        # Only the cards that changed and the areas they uncovered are drawn
+        return self.__sprites.draw(self.__screen, self.__background)
 
     ## @brief Draws the game UI.
     # @return None
     def __draw_gui(self):
-        font = pygame.font.SysFont('Arial', 18)
-        font.bold = True
+        font = self.__font
         # Moves label
         moves_text = 'Moves: ' + str(self.__moves)
+        # Score label
+        score_text = 'Score: ' + str(self.__score)
+        # Time label
+        minute_int = math.floor(self.__time / 60)
+        minute_str = '0' if minute_int == 0 else str(minute_int)
+        second_int = int(self.__time % 60)
+        second_str = str(second_int) if second_int > 9 \
+            else '0' + str(second_int)
+        time_text = minute_str + ':' + second_str
+        # Only redraws the UI if the text has changed
+        gui_text = (moves_text, score_text, time_text, self.__win)
+        if gui_text == self.__gui_text:
+            return
+        self.__gui_text = gui_text
+        for rect in self.__gui_rects:
+            self.__background.fill(self.__screen_color, rect)
         moves = font.render(moves_text, True, (255, 255, 255))
         moves_rect = moves.get_rect()
         moves_rect.center = (int(self.__screen_width / 4),
                              int(self.__screen_height
                                  - self.__window_margin / 2))
-        self.__screen.blit(moves, moves_rect)
+        self.__background.blit(moves, moves_rect)
         # Reset button
         reset = font.render('Reset', True, (255, 255, 255))
         reset_rect = moves.get_rect()
         reset_rect.center = (int(self.__screen_width / 2),
                              int(self.__screen_height
                                  - self.__window_margin / 2))
-        pygame.draw.rect(self.__screen, (125, 125, 125),
+        pygame.draw.rect(self.__background, (125, 125, 125),
                          self.__reset_rect, border_radius = 5, width = 0)
-        self.__screen.blit(reset, reset_rect)
-        # Score label
-        score_text = 'Score: ' + str(self.__score)
+        self.__background.blit(reset, reset_rect)
         score = font.render(score_text, True, (255, 255, 255))
         score_rect = moves.get_rect()
         score_rect.center = (int(3 * self.__screen_width / 4),
                              int(self.__screen_height
                                  - self.__window_margin / 2))
-        self.__screen.blit(score, score_rect)
-        # Time label
-        minute_int = math.floor(self.__time / 60)
-        minute_str = '0' if minute_int == 0 else str(minute_int)
-        second_int = int(self.__time % 60)
-        second_str = str(second_int) if second_int > 9 \
-            else '0' + str(second_int)
-        time_text = minute_str + ':' + second_str
+        self.__background.blit(score, score_rect)
         time = font.render(time_text, True, (255, 255, 255))
         time_rect = moves.get_rect()
         time_rect.center = (int(self.__screen_width / 4),
                              int(self.__window_margin / 2))
-        self.__screen.blit(time, time_rect)
+        self.__background.blit(time, time_rect)
         if self.__win:
             # Win label
             win = font.render('You won!', True, (255, 255, 255))
             win_rect = moves.get_rect()
             win_rect.center = (int(self.__screen_width / 2),
                                  int(self.__window_margin / 2))
-            self.__screen.blit(win, win_rect)
+            self.__background.blit(win, win_rect)
+        # Redrawing the UI areas along with any cards on top of them
+        for rect in self.__gui_rects:
+            self.__sprites.repaint_rect(rect)
 
     ## @brief Clears all selected cards.
     # @return None
@@ -348,6 +490,13 @@ class Solitaire:
             card.selected = False
         self.__selected_card = ['none', 0, 0]
 
+    ## @brief Stops dragging cards.
+    # @return None
+    def __clear_drag(self):
+        self.__drag_idxs = []
+        self.__drag_offsets = []
+        self.__dragging = False
+
     ## @brief Increments the stock pile.
     # @return None
     def __increment_stock(self):
@@ -404,27 +553,21 @@ class Solitaire:
         # Click on tableau card(s)
         for a in range(len(self.__tableau)):
             for b in range(len(self.__tableau[a])):
-                # Click checking rectangle
-                check_rect = pygame.Rect(0, 0, 0, 0)
                 # Current card index
                 idx = self.__tableau[a][b]
+                # Click checking rectangle at the card slot, since the card
+                # itself may still be moving
+                position = self.__tableau_positions[a][b]
+                check_rect = pygame.Rect(position[0], position[1],
+                                         self.__card_width, self.__card_height)
                 # If not at the end of the tableau column
                 if b != len(self.__tableau[a]) - 1:
                     # Next card index
                     next_idx = self.__tableau[a][b + 1]
                     # If the next card is not empty
                     if next_idx >= 0:
-                        card_rect = self.__cards[idx].rect
-                        next_card_rect = self.__cards[next_idx].rect
-                        check_rect = copy.copy(card_rect)
-                        check_rect.height = next_card_rect.y - card_rect.y
-                    # If the next card is empty
-                    else:
-                        check_rect = self.__cards[idx].rect
-                # End of the tableau column
-                else:
-                    if idx >= 0:
-                        check_rect = self.__cards[idx].rect
+                        next_position = self.__tableau_positions[a][b + 1]
+                        check_rect.height = next_position[1] - position[1]
                 # Only selects the card if it is not empty and it is clicked
                 if idx >= 0 and not self.__cards[idx].flipped:
                     if check_rect.collidepoint(cursor):
@@ -436,6 +579,54 @@ class Solitaire:
         # Return value if nothing was clicked on
         return ['none', 0, 0]
 
+    ## @brief Gets the last card of a tableau column.
+    # @param col Tableau column index
+    # @return Array of data for the last card, or the pile if it is empty
+    def __get_column_end(self, col):
+        for a in range(len(self.__tableau[col]) - 1, -1, -1):
+            if self.__tableau[col][a] >= 0:
+                return ['tableau_card', col, a]
+        return ['tableau_pile', col, -1]
+
+    ## @brief Gets the card or pile that dragged cards were dropped on.
+    # @param cursor Cursor position array
+    # @return Array of data for the card or pile that was dropped on
+    def __get_dropped(self, cursor):
+        # Dropping anywhere on a tableau column targets its last card
+        for a in range(len(self.__tableau_rects)):
+            pile_rect = self.__tableau_rects[a]
+            column_rect = pygame.Rect(pile_rect.x, pile_rect.y,
+                                      pile_rect.width,
+                                      self.__screen_height - pile_rect.y)
+            if column_rect.collidepoint(cursor):
+                return self.__get_column_end(a)
+        return self.__get_clicked(cursor)
+
+    ## @brief Gets the card indices of the current selection.
+    # @return Array of selected card indices, from top to bottom
+    def __get_selected_idxs(self):
+        if self.__selected_card[0] == 'tableau_card':
+            select_col = self.__selected_card[1]
+            select_row = self.__selected_card[2]
+            return [idx for idx in self.__tableau[select_col][select_row:]
+                    if idx >= 0]
+        idx = self.__get_selected_idx()
+        return [idx] if idx >= 0 else []
+
+    ## @brief Gets the card index of the current selection.
+    # @return Card index of the selected card, or -1 if nothing is selected
+    def __get_selected_idx(self):
+        select_col = self.__selected_card[1]
+        select_row = self.__selected_card[2]
+        if self.__selected_card[0] == 'tableau_card':
+            return self.__tableau[select_col][select_row]
+        elif self.__selected_card[0] == 'stock_reveal':
+            return self.__stock[self.__stock_idx]
+        elif self.__selected_card[0] == 'foundation':
+            rank = self.__found_ranks[select_col]
+            return self.__found_idxs[select_col][rank]
+        return -1
+
     ## @brief Checks if the selected card can be moved to designated location.
     # @param clicked_entity Destination entity where the card will be moved
     # @return True if the card can be moved
@@ -444,80 +635,44 @@ class Solitaire:
         select_row = self.__selected_card[2]
         clicked_col = clicked_entity[1]
         clicked_row = clicked_entity[2]
+        # Selected card
+        select_idx = self.__get_selected_idx()
+        if select_idx < 0:
+            return False
         if clicked_entity[0] == 'foundation':
-            # Selected card
-            card = None
+            # Foundation cards can't be moved to another foundation pile
+            if self.__selected_card[0] == 'foundation':
+                return False
+            # Don't move card to foundation if it has other cards attached
             if self.__selected_card[0] == 'tableau_card':
-                card_idx = self.__tableau[select_col][
-                    select_row]
-                # Don't move card to foundation if it has other cards attached
                 if select_row != len(self.__tableau[0]) - 1:
                     next_card_idx = self.__tableau[select_col][
                         select_row + 1]
                     if next_card_idx >= 0:
                         return False
-                card = self.__cards[card_idx]
-            elif self.__selected_card[0] == 'stock_reveal':
-                card = self.__cards[self.__stock[self.__stock_idx]]
-            if card is None:
-                return False
-            found_idx = clicked_col
-            # Only move card to foundation if the suit is empty or matches
-            if (self.__found_ranks[found_idx] < 0
-                or self.__found_suits[found_idx] == card.suit):
-                if (card.rank - self.__found_ranks[found_idx]) == 1:
-                    return True
+            # Top card of the foundation pile (-1 if empty)
+            rank = self.__found_ranks[clicked_col]
+            found_idx = self.__found_idxs[clicked_col][rank] \
+                if rank >= 0 else rules.EMPTY
+            return rules.CAN_FOUND[select_idx][found_idx]
         elif clicked_entity[0] == 'tableau_card':
-            # Selected card
-            select_card = None
-            if self.__selected_card[0] == 'tableau_card':
-                select_card = self.__cards[
-                    self.__tableau[select_col]
-                    [select_row]]
-            elif self.__selected_card[0] == 'stock_reveal':
-                select_card = self.__cards[self.__stock[self.__stock_idx]]
-            elif self.__selected_card[0] == 'foundation':
-                rank = self.__found_ranks[select_col]
-                card_idx = self.__found_idxs[select_col][rank]
-                select_card = self.__cards[card_idx]
-            if select_card is None:
-                return False
+            # Cards can only be moved onto the last card of a column
+            if clicked_row != len(self.__tableau[0]) - 1:
+                if self.__tableau[clicked_col][clicked_row + 1] >= 0:
+                    return False
             # Destination card
-            dest_card = self.__cards[
-                self.__tableau[clicked_col][clicked_row]]
-            # Checking if suits are opposite colors
-            if ((select_card.suit < 2 and dest_card.suit > 1)
-                or (select_card.suit > 1 and dest_card.suit < 2)):
-                # Checking if rank is in order
-                if (dest_card.rank - select_card.rank) == 1:
-                    return True
+            dest_idx = self.__tableau[clicked_col][clicked_row]
+            return rules.CAN_STACK[select_idx][dest_idx]
         elif clicked_entity[0] == 'tableau_pile':
-            # Selected card
-            select_card = None
-            if self.__selected_card[0] == 'tableau_card':
-                select_card = self.__cards[
-                    self.__tableau[select_col]
-                    [select_row]]
-            elif self.__selected_card[0] == 'stock_reveal':
-                select_card = self.__cards[self.__stock[self.__stock_idx]]
-            elif self.__selected_card[0] == 'foundation':
-                rank = self.__found_ranks[select_col]
-                card_idx = self.__found_idxs[select_col][rank]
-                select_card = self.__cards[card_idx]
-            if select_card is None:
-                return False
-            # Card can only move to the tableau pile start if it is a king
-            # and the pile is empty
-            if select_card.rank == 12:
-                if self.__tableau[clicked_col][0] == -1:
-                    return True
+            # Card can only move to the tableau pile start if the pile is empty
+            if self.__tableau[clicked_col][0] == -1:
+                return rules.CAN_STACK[select_idx][rules.EMPTY]
         return False
 
     ## @brief Handler for the left click event.
-    # @param cursor Cursor position array
+    # @param clicked_entity Array of data for the clicked card or pile
     # @return True if a move was made
-    def __click_handler(self, cursor):
-        clicked_entity = self.__get_clicked(cursor)
+    def __click_handler(self, clicked_entity):
         select_col = self.__selected_card[1]
         select_row = self.__selected_card[2]
         clicked_col = clicked_entity[1]
@@ -622,7 +777,7 @@ class Solitaire:
                         # Adding card to the foundation
                         if self.__found_suits[clicked_col] == -1:
                             self.__found_suits[clicked_col] = (
-                                self.__cards[card_idx].suit)
+                                rules.CARD_SUITS[card_idx])
                         self.__found_ranks[clicked_col] += 1
                         rank = self.__found_ranks[clicked_col]
                         self.__found_idxs[clicked_col][rank] = card_idx
@@ -635,7 +790,7 @@ class Solitaire:
                         # Adding card to the foundation
                         if self.__found_suits[clicked_col] == -1:
                             self.__found_suits[clicked_col] = (
-                                self.__cards[card_idx].suit)
+                                rules.CARD_SUITS[card_idx])
                         self.__found_ranks[clicked_col] += 1
                         rank = self.__found_ranks[clicked_col]
                         self.__found_idxs[clicked_col][rank] = card_idx
@@ -660,44 +815,454 @@ class Solitaire:
                 win_check *= 1
             else:
                 win_check *= 0
+        if win_check == 1 and not self.__win:
+            self.__start_win_cascade()
         self.__win = (win_check == 1)
 
+    ## @brief Throws the foundation cards off of the table one at a time.
+    # @return None
+    def __start_win_cascade(self):
+        # Time in seconds between each thrown card
+        delay = 0.1
+        # Lowest y coordinate the cards bounce off of
+        floor = self.__screen_height - self.__card_height
+        order = 0
+        for b in range(12, -1, -1):
+            for a in range(len(self.__found_idxs)):
+                idx = self.__found_idxs[a][b]
+                if idx >= 0:
+                    velocity = [rnd.choice([-1, 1]) * rnd.uniform(150, 400),
+                                -rnd.uniform(0, 300)]
+                    self.__cards[idx].throw(velocity, order * delay, floor)
+                    order += 1
+
+    ## @brief Hides thrown cards once they have left the screen.
+    # @return None
+    def __hide_thrown_cards(self):
+        screen_rect = self.__screen.get_rect()
+        for card in self.__cards:
+            if (card.velocity is not None and card.visible
+                    and not screen_rect.colliderect(card.rect)):
+                card.visible = 0
+
+    ## @brief Moves revealed cards to the foundation once all cards are
+    # revealed.
+    # @param dt Time since the last update in seconds
+    # @return None
+    def __auto_collect(self, dt):
+        # Only collects when the stock is empty and nothing is being dragged
+        if self.__win or self.__drag_idxs or len(self.__stock) > 0:
+            self.__collect_time = 0
+            return
+        # Only collects when every tableau card is revealed
+        for col in self.__tableau:
+            for idx in col:
+                if idx >= 0 and self.__cards[idx].flipped:
+                    self.__collect_time = 0
+                    return
+        self.__collect_time += dt
+        if self.__collect_time < self.__collect_delay:
+            return
+        self.__collect_time = 0
+        # Finding the lowest ranked card that can go to a foundation pile
+        best = None
+        for a in range(len(self.__tableau)):
+            for b in range(len(self.__tableau[a]) - 1, -1, -1):
+                idx = self.__tableau[a][b]
+                if idx >= 0:
+                    break
+            if idx < 0:
+                continue
+            for c in range(len(self.__found_idxs)):
+                rank = self.__found_ranks[c]
+                found_idx = self.__found_idxs[c][rank] \
+                    if rank >= 0 else rules.EMPTY
+                if rules.CAN_FOUND[idx][found_idx]:
+                    if best is None or rules.CARD_RANKS[idx] < best[0]:
+                        best = (rules.CARD_RANKS[idx], a, b, c)
+                    break
+        if best is None:
+            return
+        self.__clear_selected_cards()
+        self.__selected_card = ['tableau_card', best[1], best[2]]
+        if self.__click_handler(['foundation', best[3], 0]):
+            self.__moves += 1
+        self.__get_game_win()
+
+    ## @brief Gets the cards on the board.
+    # @return (tableau, hidden, stock, stock index, foundation suits,
+    # foundation ranks) array, with the card indices of each tableau column,
+    # the number of flipped cards in each column and the suit and top rank
+    # of each foundation pile
+    def __get_board(self):
+        tableau = []
+        hidden = []
+        for col in self.__tableau:
+            idxs = [idx for idx in col if idx >= 0]
+            tableau.append(idxs)
+            hidden.append(len([idx for idx in idxs
+                               if self.__cards[idx].flipped]))
+        return (tableau, hidden, list(self.__stock), self.__stock_idx,
+                list(self.__found_suits), list(self.__found_ranks))
+
+    ## @brief Sets up the cards on the board.
+    # @param tableau Array of card indices in each tableau column
+    # @param hidden Array of the number of flipped cards in each column
+    # @param stock Array of card indices in the stock
+    # @param stock_idx Current stock index
+    # @param found_suits Array of the suit of each foundation pile (-1 if
+    # empty)
+    # @param found_ranks Array of the top rank of each foundation pile (-1 if
+    # empty)
+    # @return None
+    def __set_board(self, tableau, hidden, stock, stock_idx, found_suits,
+                    found_ranks):
+        self.__clear_selected_cards()
+        self.__clear_drag()
+        self.__stop_autoplay()
+        # Setting the tableau cards
+        for a in range(len(self.__tableau)):
+            for b in range(len(self.__tableau[a])):
+                idx = tableau[a][b] if b < len(tableau[a]) else -1
+                self.__tableau[a][b] = idx
+                if idx >= 0:
+                    self.__cards[idx].flipped = b < hidden[a]
+        # Setting the stock cards
+        self.__stock = list(stock)
+        self.__stock_idx = stock_idx
+        for a in range(len(self.__stock)):
+            self.__cards[self.__stock[a]].flipped = a > stock_idx
+        # Setting the foundation cards
+        for a in range(len(self.__found_idxs)):
+            suit = found_suits[a]
+            rank = found_ranks[a]
+            for b in range(len(self.__found_idxs[a])):
+                idx = suit * rules.RANK_COUNT + b
+                self.__found_idxs[a][b] = idx if b <= rank else -1
+                if b <= rank:
+                    self.__cards[idx].flipped = False
+            self.__found_suits[a] = suit if rank >= 0 else -1
+            self.__found_ranks[a] = rank
+        for card in self.__cards:
+            card.catch()
+        self.__win = self.__found_ranks == [rules.RANK_COUNT - 1] * 4
+
+    ## @brief Gets the game state used by the solver.
+    # @return Solver game state
+    def __get_solver_state(self):
+        tableau, hidden, stock, stock_idx, found_suits, found_ranks = \
+            self.__get_board()
+        found = [rules.EMPTY] * rules.SUIT_COUNT
+        for a in range(len(found_suits)):
+            if found_ranks[a] >= 0:
+                found[found_suits[a]] = (found_suits[a] * rules.RANK_COUNT
+                                         + found_ranks[a])
+        return (tuple(tuple(col) for col in tableau), tuple(hidden),
+                tuple(stock), stock_idx, tuple(found))
+
+    ## @brief Sets up the board from a solver game state.
+    #
+    # Foundation pile a holds the cards of suit a.
+    # @param state Solver game state
+    # @return None
+    def __set_solver_state(self, state):
+        tableau, hidden, stock, stock_idx, found = state
+        found_ranks = [rules.CARD_RANKS[idx] if idx >= 0 else -1
+                       for idx in found]
+        self.__set_board(tableau, hidden, stock, stock_idx,
+                         list(range(rules.SUIT_COUNT)), found_ranks)
+
+    ## @brief Makes a solver move in the game.
+    # @param move Solver move array
+    # @return True if the move was made
+    def __make_solver_move(self, move):
+        kind, col, row, dest = move
+        self.__clear_selected_cards()
+        if kind == solver.STOCK:
+            self.__increment_stock()
+            return True
+        # Selecting the moved card(s)
+        if kind == solver.STOCK_TO_FOUND or kind == solver.STOCK_TO_TABLEAU:
+            if self.__stock_idx < 0:
+                return False
+            self.__selected_card = ['stock_reveal', 0, 0]
+        elif kind == solver.TABLEAU_TO_FOUND \
+                or kind == solver.TABLEAU_TO_TABLEAU:
+            self.__selected_card = ['tableau_card', col, row]
+        else:
+            return False
+        # Moving the card(s) to the foundation pile of the suit, or the first
+        # empty foundation pile
+        if kind == solver.STOCK_TO_FOUND or kind == solver.TABLEAU_TO_FOUND:
+            suit = rules.CARD_SUITS[self.__get_selected_idx()]
+            found_col = -1
+            for a in range(len(self.__found_suits)):
+                if self.__found_suits[a] == suit:
+                    found_col = a
+                    break
+                if self.__found_suits[a] == -1 and found_col < 0:
+                    found_col = a
+            clicked_entity = ['foundation', found_col, 0]
+        # Moving the card(s) to the end of the tableau column
+        else:
+            clicked_entity = self.__get_column_end(dest)
+        moved = self.__click_handler(clicked_entity)
+        self.__clear_selected_cards()
+        return moved
+
+    ## @brief Starts solving the game in the background for the auto-play.
+    # @return None
+    def __start_autoplay(self):
+        if self.__autoplay_executor is None:
+            # Forking would copy the SDL threads of this process, so the
+            # worker is started from a clean process instead
+            if 'forkserver' in mp.get_all_start_methods():
+                context = mp.get_context('forkserver')
+            else:
+                context = mp.get_context('spawn')
+            self.__autoplay_executor = futures.ProcessPoolExecutor(
+                1, mp_context = context)
+        self.__autoplay_state = self.__get_solver_state()
+        self.__autoplay_future = self.__autoplay_executor.submit(
+            _solve_autoplay, self.__autoplay_state, self.__solve_time,
+            self.__minimize_time)
+        self.__autoplay_time = 0
+
+    ## @brief Stops the auto-play and drops any pending solve.
+    # @return None
+    def __stop_autoplay(self):
+        self.__autoplay_moves = []
+        if self.__autoplay_future is not None:
+            self.__autoplay_future.cancel()
+            self.__autoplay_future = None
+
+    ## @brief Checks if the auto-play is solving or playing.
+    # @return True if the auto-play is running
+    def __is_autoplaying(self):
+        return bool(self.__autoplay_moves) \
+            or self.__autoplay_future is not None
+
+    ## @brief Plays the next auto-play move.
+    # @param dt Time since the last update in seconds
+    # @return None
+    def __autoplay(self, dt):
+        # Starting to play once the background solve is done
+        if self.__autoplay_future is not None:
+            if not self.__autoplay_future.done():
+                return
+            try:
+                data = self.__autoplay_future.result()
+            except futures.BrokenExecutor:
+                # The worker died, so the next auto-play starts a new one
+                self.__autoplay_executor = None
+                data = None
+            self.__autoplay_future = None
+            if data is None or self.__win \
+                    or self.__get_solver_state() != self.__autoplay_state:
+                return
+            self.__autoplay_moves = solver.unpack_moves(data)
+        if not self.__autoplay_moves or self.__win:
+            return
+        self.__autoplay_time += dt
+        if self.__autoplay_time < self.__autoplay_delay:
+            return
+        self.__autoplay_time = 0
+        move = self.__autoplay_moves.pop(0)
+        # The auto-collect moves the remaining cards
+        if move[0] == solver.COLLECT:
+            self.__stop_autoplay()
+            return
+        if self.__make_solver_move(move):
+            self.__moves += 1
+            self.__get_game_win()
+        else:
+            self.__stop_autoplay()
+
+    ## @brief Handler for the left mouse button being pressed.
+    # @param cursor Cursor position array
+    # @return None
+    def __press_handler(self, cursor):
+        clicked_entity = self.__get_clicked(cursor)
+        if self.__click_handler(clicked_entity):
+            self.__moves += 1
+            self.__get_game_win()
+            return
+        # Only cards that were just selected can be dragged
+        if self.__selected_card != clicked_entity:
+            return
+        # Picking up the selected card(s) so that they can be dragged
+        self.__drag_idxs = self.__get_selected_idxs()
+        self.__drag_offsets = []
+        for idx in self.__drag_idxs:
+            card = self.__cards[idx]
+            self.__drag_offsets.append([card.position[0] - cursor[0],
+                                        card.position[1] - cursor[1]])
+        self.__drag_start = cursor
+        self.__drag_cursor = cursor
+        self.__dragging = False
+
+    ## @brief Handler for the mouse being moved.
+    # @param cursor Cursor position array
+    # @return None
+    def __motion_handler(self, cursor):
+        if not self.__drag_idxs:
+            return
+        self.__drag_cursor = cursor
+        # Only starts dragging once the cursor has moved far enough so that
+        # clicks still select cards
+        if not self.__dragging:
+            distance = math.hypot(cursor[0] - self.__drag_start[0],
+                                  cursor[1] - self.__drag_start[1])
+            self.__dragging = distance >= self.__drag_threshold
+
+    ## @brief Handler for the left mouse button being released.
+    # @param cursor Cursor position array
+    # @return None
+    def __release_handler(self, cursor):
+        if self.__dragging:
+            if self.__click_handler(self.__get_dropped(cursor)):
+                self.__moves += 1
+                self.__get_game_win()
+            else:
+                # Cards that were not dropped on a valid pile slide back
+                self.__clear_selected_cards()
+        self.__clear_drag()
+
+    ## @brief Draws a solver game state without animating or waiting.
+    # @param state Solver game state
+    # @return Game screen surface with the drawn board
+    def render_state(self, state):
+        self.__set_solver_state(state)
+        self.__get_card_positions()
+        # Placing the cards at their slots instead of moving them there
+        for card in self.__cards:
+            card.place(card.target[0], card.target[1])
+        self.__update_sprites(0)
+        self.__draw_gui()
+        self.__sprites.repaint_rect(self.__screen.get_rect())
+        self.__draw_game()
+        return self.__screen
+
+    ## @brief Saves the game to a snapshot.
+    # @return Snapshot bytes
+    def save_game(self):
+        snap = snapshot.Snapshot()
+        (snap.tableau, snap.hidden, snap.stock, snap.stock_idx,
+         snap.found_suits, snap.found_ranks) = self.__get_board()
+        snap.moves = self.__moves
+        snap.score = self.__score
+        snap.time = self.__time
+        return snap.pack()
+
+    ## @brief Loads the game from a snapshot.
+    # @param data Snapshot bytes
+    # @return None
+    def load_game(self, data):
+        snap = snapshot.Snapshot.unpack(data)
+        self.__set_board(snap.tableau, snap.hidden, snap.stock,
+                         snap.stock_idx, snap.found_suits, snap.found_ranks)
+        self.__moves = snap.moves
+        self.__score = snap.score
+        self.__time = snap.time
+
+    ## @brief Writes the game to the save file.
+    #
+    # The previous save file is kept if the game can't be saved.
+    # @return None
+    def __write_save(self):
+        try:
+            data = self.save_game()
+        except ValueError:
+            return
+        # Writing to a temporary file first so an interrupted save can't
+        # leave a broken save file
+        with open(self.__save_path + '.tmp', 'wb') as save_file:
+            save_file.write(data)
+        os.replace(self.__save_path + '.tmp', self.__save_path)
+
+    ## @brief Loads the game from the save file.
+    #
+    # The current game is kept if the save file is missing, broken or from
+    # an unsupported version.
+    # @return None
+    def __read_save(self):
+        if not os.path.exists(self.__save_path):
+            return
+        with open(self.__save_path, 'rb') as save_file:
+            data = save_file.read()
+        try:
+            self.load_game(data)
+        except ValueError:
+            return
+
     ## @brief Runs the game (must be in a continuous loop).
     # @return None
     def run_game(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.quit = True
+                self.__stop_autoplay()
+                if self.__autoplay_executor is not None:
+                    self.__autoplay_executor.shutdown(wait = False)
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
                     if self.__reset_rect.collidepoint(event.pos):
                         self.__reset_game()
-                    if not self.__win:
-                        if self.__click_handler(event.pos):
-                            self.__moves += 1
-                        self.__get_game_win()
+                    elif not self.__win:
+                        self.__stop_autoplay()
+                        self.__press_handler(event.pos)
+            if event.type == pygame.MOUSEMOTION:
+                self.__motion_handler(event.pos)
+            if event.type == pygame.MOUSEBUTTONUP:
+                if event.button == 1:
+                    self.__release_handler(event.pos)
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
                     if not self.__win:
+                        self.__clear_drag()
+                        self.__stop_autoplay()
                         self.__increment_stock()
                         self.__moves += 1
-        self.__screen.fill(self.__screen_color)
+                # Saves the game to the save file
+                if event.key == pygame.K_s:
+                    self.__write_save()
+                # Loads the game from the save file
+                if event.key == pygame.K_l:
+                    self.__read_save()
+                # Toggles the auto-play
+                if event.key == pygame.K_a:
+                    if self.__is_autoplaying():
+                        self.__stop_autoplay()
+                    elif not self.__win:
+                        self.__clear_drag()
+                        self.__start_autoplay()
+        # Time since the last frame in seconds
+        dt = self.__clock.get_time() / 1000
+        self.__time += dt
+        self.__autoplay(dt)
+        self.__auto_collect(dt)
         self.__get_card_positions()
-        self.__draw_game()
+        self.__update_sprites(dt)
+        self.__hide_thrown_cards()
         self.__draw_gui()
-        self.__time += self.__clock.get_time() / 1000
+        pygame.display.update(self.__draw_game())
         self.__clock.tick(60)
-        pygame.display.flip()
 
 ## @class PlayingCard
 # @brief Contains methods and attributes for playing cards.
-class PlayingCard:
+class PlayingCard(pygame.sprite.DirtySprite):
+    ## @brief Cache of card backing surfaces shared by all cards
+    __backing_cache = {}
+    ## @brief Cache of fonts shared by all cards
+    __font_cache = {}
+
     ## @param suit Card suit
     # @param rank Card rank
     # @param width Card width
     # @param height Card height
     # @return PlayingCard object
     def __init__(self, suit, rank, width, height):
+        super().__init__()
         ## @brief Card suit (club, spade, diamond, heart)
         # @hideinitializer
         self.suit = suit
@@ -707,100 +1272,271 @@ class PlayingCard:
         ## @brief Card rectangle object
         # @hideinitializer
         self.rect = pygame.Rect(0, 0, width, height)
-        ## @brief Card is flipped over if true 
+        ## @brief Exact card position used for smooth movement
         # @hideinitializer
-        self.flipped = True
-        ## @brief Card is flipped over if true
+        self.position = [0.0, 0.0]
+        ## @brief Position the card is moving towards
+        # @hideinitializer
+        self.target = [0.0, 0.0]
+        ## @brief Velocity of a thrown card (None if the card is not thrown)
+        # @hideinitializer
+        self.velocity = None
+        ## @brief Time in seconds before a thrown card starts moving
+        # @hideinitializer
+        self.delay = 0
+        ## @brief Lowest y coordinate a thrown card bounces off of
         # @hideinitializer
-        self.selected = False
+        self.floor = 0
         ## @brief Selection border color
         # @hideinitializer
         self.__select_color = (255, 255, 0)
         ## @brief Border width the cards
         # @hideinitializer
         self.__border = 2
+        ## @brief Card movement speed in pixels per second
+        # @hideinitializer
+        self.__speed = 1800
+        ## @brief Downward acceleration of a thrown card in pixels per second
+        # squared
+        # @hideinitializer
+        self.__gravity = 1500
+        ## @brief Fraction of the speed kept when a thrown card bounces
+        # @hideinitializer
+        self.__bounce = 0.7
+        ## @brief Card is flipped over if true
+        # @hideinitializer
+        self.__flipped = True
+        ## @brief Card is selected if true
+        # @hideinitializer
+        self.__selected = False
+        ## @brief Cached face surfaces (unselected, selected)
+        # @hideinitializer
+        self.__faces = [self.__render_face(False), self.__render_face(True)]
+        ## @brief Cached backing surfaces (unselected, selected)
+        # @hideinitializer
+        self.__backs = [self.__render_back(False), self.__render_back(True)]
+        ## @brief Current card surface
+        # @hideinitializer
+        self.image = None
+        self.__update_image()
+
+    ## @brief Card is flipped over if true
+    @property
+    def flipped(self):
+        return self.__flipped
 
-    ## @brief Draws the card on the screen.
-    # @param screen Game screen object
+    @flipped.setter
+    def flipped(self, flipped):
+        if flipped != self.__flipped:
+            self.__flipped = flipped
+            self.__update_image()
+
+    ## @brief Card is selected if true
+    @property
+    def selected(self):
+        return self.__selected
+
+    @selected.setter
+    def selected(self, selected):
+        if selected != self.__selected:
+            self.__selected = selected
+            self.__update_image()
+
+    ## @brief Clears the cached fonts and surfaces, which are no longer valid
+    # once pygame is quit.
     # @return None
-    def draw_card(self, screen):
-        # Draws back of the card if flipped
-        if self.flipped:
+    @classmethod
+    def clear_cache(cls):
+        cls.__backing_cache.clear()
+        cls.__font_cache.clear()
+
+    ## @brief Gets a cached font.
+    # @param size Font size
+    # @return Font object
+    @classmethod
+    def __get_font(cls, size):
+        if size not in cls.__font_cache:
+            cls.__font_cache[size] = pygame.font.SysFont('Arial', size)
+        return cls.__font_cache[size]
+
+    ## @brief Draws the card border on a surface.
+    # @param surface Card surface
+    # @param selected Draws the selection border if true
+    # @return None
+    def __draw_border(self, surface, selected):
+        border_color = (0, 0, 0)
+        if selected:
+            border_color = self.__select_color
+        # Draws black self.__border for card outline
+        pygame.draw.rect(surface, border_color, surface.get_rect(),
+                         width = self.__border)
+
+    ## @brief Renders the back of the card.
+    # @param selected Draws the selection border if true
+    # @return Card backing surface
+    def __render_back(self, selected):
+        key = (self.rect.width, self.rect.height, selected)
+        if key not in self.__backing_cache:
             backing_image = pygame.image.load('images/backing.jpg')
+            # Converting to the screen format makes blits faster
+            if pygame.display.get_surface() is not None:
+                backing_image = backing_image.convert()
             scaled_image = pygame.transform.scale(backing_image,
                                                   (self.rect.width,
                                                    self.rect.height))
-            screen.blit(scaled_image, self.rect)
+            self.__draw_border(scaled_image, selected)
+            self.__backing_cache[key] = scaled_image
+        return self.__backing_cache[key]
+
+    ## @brief Renders the face of the card.
+    # @param selected Draws the selection border if true
+    # @return Card face surface
+    def __render_face(self, selected):
+        surface = pygame.Surface((self.rect.width, self.rect.height))
+        rect = surface.get_rect()
+        # Setting the suit color
+        suit_color = (0, 0, 0)
+        if self.suit > 1:
+            suit_color = (255, 0, 0)
+        # Setting the suit unicode character
+        suit_char = ''
+        match self.suit:
+            case 0:
+                # Club
+                suit_char = '\u2663'
+            case 1:
+                # Spade
+                suit_char = '\u2660'
+            case 2:
+                # Diamond
+                suit_char = '\u2666'
+            case 3:
+                # Heart
+                suit_char = '\u2665'
+        # Setting the rank text
+        rank_text = ''
+        match self.rank:
+            case 0:
+                rank_text = 'A'
+            case 10:
+                rank_text = 'J'
+            case 11:
+                rank_text = 'Q'
+            case 12:
+                rank_text = 'K'
+            case _:
+                rank_text = str(self.rank + 1)
+        rank_font = self.__get_font(18)
+        # Top left rank text
+        tl_rank = rank_font.render(rank_text, True, suit_color)
+        tl_rank_rect = tl_rank.get_rect()
+        tl_rank_rect.center = (int(rect.width / 5), int(rect.height / 5))
+        # Bottom right rank text
+        br_rank = rank_font.render(rank_text, True, suit_color)
+        br_rank_rect = br_rank.get_rect()
+        br_rank_rect.center = (int(4 * rect.width / 5),
+                               int(4 * rect.height / 5))
+        br_rank_rot = pygame.transform.rotate(br_rank, 180)
+        # Center suit text
+        suit_font = self.__get_font(28)
+        suit_text = suit_font.render(suit_char, True, suit_color)
+        suit_text_rect = suit_text.get_rect()
+        suit_text_rect.center = (int(rect.width / 2), int(rect.height / 2))
+        # Top right suit text
+        tr_suit = suit_font.render(suit_char, True, suit_color)
+        tr_suit_rect = tr_suit.get_rect()
+        tr_suit_rect.center = (int(4 * rect.width / 5), int(rect.height / 5))
+        # Bottom left suit text
+        bl_suit = suit_font.render(suit_char, True, suit_color)
+        bl_suit_rect = bl_suit.get_rect()
+        bl_suit_rect.center = (int(rect.width / 5), int(4 * rect.height / 5))
+        bl_suit_rot = pygame.transform.rotate(bl_suit, 180)
+        pygame.draw.rect(surface, (255, 255, 255), rect, width = 0)
+        surface.blit(tl_rank, tl_rank_rect)
+        surface.blit(br_rank_rot, br_rank_rect)
+        surface.blit(suit_text, suit_text_rect)
+        surface.blit(tr_suit, tr_suit_rect)
+        surface.blit(bl_suit_rot, bl_suit_rect)
+        self.__draw_border(surface, selected)
+        return surface
+
+    ## @brief Sets the card surface from the cached surfaces.
+    # @return None
+    def __update_image(self):
+        if self.__flipped:
+            self.image = self.__backs[int(self.__selected)]
         else:
-            # Setting the suit color
-            suit_color = (0, 0, 0)
-            if self.suit > 1:
-                suit_color = (255, 0, 0)
-            # Setting the suit unicode character
-            suit_char = ''
-            match self.suit:
-                case 0:
-                    # Club
-                    suit_char = '\u2663'
-                case 1:
-                    # Spade
-                    suit_char = '\u2660'
-                case 2:
-                    # Diamond
-                    suit_char = '\u2666'
-                case 3:
-                    # Heart
-                    suit_char = '\u2665'
-            # Setting the rank text
-            rank_text = ''
-            match self.rank:
-                case 0:
-                    rank_text = 'A'
-                case 10:
-                    rank_text = 'J'
-                case 11:
-                    rank_text = 'Q'
-                case 12:
-                    rank_text = 'K'
-                case _:
-                    rank_text = str(self.rank + 1)
-            rank_font = pygame.font.SysFont('Arial', 18)
-            # Top left rank text
-            tl_rank = rank_font.render(rank_text, True, suit_color)
-            tl_rank_rect = tl_rank.get_rect()
-            tl_rank_rect.center = (self.rect.x + int(self.rect.width / 5),
-                                   self.rect.y + int(self.rect.height / 5))
-            # Bottom right rank text
-            br_rank = rank_font.render(rank_text, True, suit_color)
-            br_rank_rect = br_rank.get_rect()
-            br_rank_rect.center = (self.rect.x + int(4 * self.rect.width / 5),
-                                   self.rect.y + int(4 * self.rect.height / 5))
-            br_rank_rot = pygame.transform.rotate(br_rank, 180)
-            # Center suit text
-            suit_font = pygame.font.SysFont('Arial', 28)
-            suit_text = suit_font.render(suit_char, True, suit_color)
-            suit_text_rect = suit_text.get_rect()
-            suit_text_rect.center = (self.rect.x + int(self.rect.width / 2),
-                                     self.rect.y + int(self.rect.height / 2))
-            # Top right suit text
-            tr_suit = suit_font.render(suit_char, True, suit_color)
-            tr_suit_rect = tr_suit.get_rect()
-            tr_suit_rect.center = (self.rect.x + int(4 * self.rect.width / 5),
-                                   self.rect.y + int(self.rect.height / 5))
-            # Bottom left suit text
-            bl_suit = suit_font.render(suit_char, True, suit_color)
-            bl_suit_rect = bl_suit.get_rect()
-            bl_suit_rect.center = (self.rect.x + int(self.rect.width / 5),
-                                   self.rect.y + int(4 * self.rect.height / 5))
-            bl_suit_rot = pygame.transform.rotate(bl_suit, 180)
-            pygame.draw.rect(screen, (255, 255, 255), self.rect, width = 0)
-            screen.blit(tl_rank, tl_rank_rect)
-            screen.blit(br_rank_rot, br_rank_rect)
-            screen.blit(suit_text, suit_text_rect)
-            screen.blit(tr_suit, tr_suit_rect)
-            screen.blit(bl_suit_rot, bl_suit_rect)
-        border_color = (0, 0, 0)
-        if self.selected:
-            border_color = self.__select_color
-        # Draws black self.__border for card outline
-        pygame.draw.rect(screen, border_color, self.rect, width = self.__border)
\ No newline at end of file
+            self.image = self.__faces[int(self.__selected)]
+        self.dirty = 1
+
+    ## @brief Checks if the card is moving.
+    # @return True if the card is not resting at its target position
+    def is_moving(self):
+        return self.velocity is not None or self.position != self.target
+
+    ## @brief Places the card at a position without animating it.
+    # @param x X coordinate of the card
+    # @param y Y coordinate of the card
+    # @return None
+    def place(self, x, y):
+        self.position = [x, y]
+        self.target = [x, y]
+        self.__update_rect()
+
+    ## @brief Throws the card for the win cascade.
+    # @param velocity Initial velocity array
+    # @param delay Time in seconds before the card starts moving
+    # @param floor Lowest y coordinate the card bounces off of
+    # @return None
+    def throw(self, velocity, delay, floor):
+        self.velocity = velocity
+        self.delay = delay
+        self.floor = floor
+
+    ## @brief Stops the card from being thrown and shows it again.
+    # @return None
+    def catch(self):
+        self.velocity = None
+        self.visible = 1
+        self.dirty = 1
+
+    ## @brief Sets the card rectangle from the exact card position.
+    # @return None
+    def __update_rect(self):
+        x = round(self.position[0])
+        y = round(self.position[1])
+        if x != self.rect.x or y != self.rect.y:
+            self.rect.x = x
+            self.rect.y = y
+            self.dirty = 1
+
+    ## @brief Moves the card along its path.
+    # @param dt Time since the last update in seconds
+    # @return None
+    def update(self, dt):
+        # Thrown card
+        if self.velocity is not None:
+            if not self.visible:
+                return
+            if self.delay > 0:
+                self.delay -= dt
+                return
+            self.velocity[1] += self.__gravity * dt
+            self.position[0] += self.velocity[0] * dt
+            self.position[1] += self.velocity[1] * dt
+            # Bouncing off of the floor
+            if self.position[1] > self.floor:
+                self.position[1] = self.floor
+                self.velocity[1] *= -self.__bounce
+        # Card moving towards its target
+        elif self.position != self.target:
+            dx = self.target[0] - self.position[0]
+            dy = self.target[1] - self.position[1]
+            distance = math.hypot(dx, dy)
+            step = self.__speed * dt
+            if distance <= step:
+                self.position = list(self.target)
+            else:
+                self.position[0] += dx * step / distance
+                self.position[1] += dy * step / distance
+        self.__update_rect()
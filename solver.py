@@ -0,0 +1,725 @@
+## @file solver.py
+# @brief Implements a depth first solver for the solitaire game rules.
+#
+# The solver works on a compact, hashable game state instead of the pygame
+# game object, so it can run in worker processes without a window. A state is
+# the tuple (tableau, hidden, stock, stock_idx, found), where:
+# - tableau is a tuple of 7 tuples of card indices, from top to bottom
+# - hidden is a tuple of the number of flipped cards at the top of each column
+# - stock is a tuple of the card indices in the stock
+# - stock_idx is the index of the revealed stock card (-1 if none)
+# - found is a tuple of the top card index of each suit's foundation (-1 if
+#   empty)
+#
+# A move is the tuple (kind, col, row, dest), where col and row are the
+# source tableau column and row and dest is the destination tableau column.
+# Unused fields are 0.
+
+import multiprocessing as mp
+import multiprocessing.shared_memory as shm
+import queue
+import random as rnd
+import time
+import rules
+
+## @brief Move kind for revealing the next stock card
+STOCK = 0
+## @brief Move kind for moving the revealed stock card to the foundation
+STOCK_TO_FOUND = 1
+## @brief Move kind for moving the revealed stock card to the tableau
+STOCK_TO_TABLEAU = 2
+## @brief Move kind for moving a tableau card to the foundation
+TABLEAU_TO_FOUND = 3
+## @brief Move kind for moving tableau card(s) to another tableau column
+TABLEAU_TO_TABLEAU = 4
+## @brief Move kind for moving every card to the foundation once the stock is
+# empty and every tableau card is revealed (the game's auto-collect)
+COLLECT = 5
+
+## @brief Foundation state of a won game
+WON_FOUND = tuple(suit * rules.RANK_COUNT + rules.RANK_COUNT - 1
+                  for suit in range(rules.SUIT_COUNT))
+
+## @brief Deals a new game the same way the game does.
+# @param seed Random seed of the deal (None for a random deal)
+# @return Game state
+def deal(seed=None):
+    random_idxs = rnd.Random(seed).sample(range(0, rules.DECK_SIZE),
+                                          rules.DECK_SIZE)
+    tableau = []
+    temp_idx = 0
+    for a in range(7):
+        tableau.append(tuple(random_idxs[temp_idx:temp_idx + a + 1]))
+        temp_idx += a + 1
+    hidden = tuple(range(7))
+    stock = tuple(random_idxs[temp_idx:])
+    found = (rules.EMPTY,) * rules.SUIT_COUNT
+    return (tuple(tableau), hidden, stock, -1, found)
+
+## @brief Checks if the game is won.
+# @param state Game state
+# @return True if every foundation pile is complete
+def is_won(state):
+    return state[4] == WON_FOUND
+
+## @brief Gets the transposition key of a state.
+# @param state Game state
+# @return Hashable key that is equal for states that only differ in the
+# order of the tableau columns
+def get_key(state):
+    return (tuple(sorted(zip(state[0], state[1]))),
+            state[2], state[3], state[4])
+
+## @brief Gets the 64 bit hash of a state.
+# @param state Game state
+# @return Non-zero 64 bit hash, which is the same in every process
+def get_hash(state):
+    # Tuples of integers hash the same in every process
+    key_hash = hash(get_key(state)) & 0xFFFFFFFFFFFFFFFF
+    return key_hash if key_hash != 0 else 1
+
+## @brief Checks if every remaining card can be auto-collected.
+# @param state Game state
+# @return True if the stock is empty and every tableau card is revealed
+def can_collect(state):
+    return not state[2] and not any(state[1])
+
+## @brief Checks if a move follows the game rules.
+# @param state Game state
+# @param move Move array
+# @return True if the move can be made
+def is_legal(state, move):
+    tableau, hidden, stock, stock_idx, found = state
+    kind, col, row, dest = move
+    if kind == STOCK:
+        return len(stock) > 0
+    elif kind == COLLECT:
+        return can_collect(state)
+    elif kind == STOCK_TO_FOUND or kind == STOCK_TO_TABLEAU:
+        if stock_idx < 0:
+            return False
+        card_idx = stock[stock_idx]
+    elif kind == TABLEAU_TO_FOUND or kind == TABLEAU_TO_TABLEAU:
+        if col < 0 or col >= 7 or row < hidden[col] or row >= len(tableau[col]):
+            return False
+        # Only the last card of a column can go to the foundation
+        if kind == TABLEAU_TO_FOUND and row != len(tableau[col]) - 1:
+            return False
+        card_idx = tableau[col][row]
+    else:
+        return False
+    if kind == STOCK_TO_FOUND or kind == TABLEAU_TO_FOUND:
+        return rules.CAN_FOUND[card_idx][found[rules.CARD_SUITS[card_idx]]]
+    if dest < 0 or dest >= 7 or (kind == TABLEAU_TO_TABLEAU and dest == col):
+        return False
+    dest_idx = tableau[dest][-1] if tableau[dest] else rules.EMPTY
+    return rules.CAN_STACK[card_idx][dest_idx]
+
+## @brief Replays a move sequence.
+# @param state Game state
+# @param moves Array of moves, or moves packed by pack_moves
+# @return Game state after the moves, or None if a move is not legal
+def replay(state, moves):
+    if isinstance(moves, (bytes, bytearray)):
+        moves = unpack_moves(moves)
+    for move in moves:
+        if not is_legal(state, move):
+            return None
+        state = apply_move(state, move)
+    return state
+
+## @brief Packs a move sequence into bytes.
+#
+# Every move takes two bytes holding the move kind (3 bits), the source
+# column (3 bits), the source row (5 bits) and the destination column
+# (3 bits). Runs of stock moves are stored as one move with the run length in
+# the row bits.
+# @param moves Array of moves
+# @return Packed moves
+def pack_moves(moves):
+    # Maximum number of stock moves stored in one move
+    max_run = 31
+    data = bytearray()
+    a = 0
+    while a < len(moves):
+        kind, col, row, dest = moves[a]
+        if kind == STOCK:
+            row = 1
+            while (a + row < len(moves) and row < max_run
+                   and moves[a + row][0] == STOCK):
+                row += 1
+            a += row
+        else:
+            a += 1
+        if not (STOCK <= kind <= COLLECT and 0 <= col < 7
+                and 0 <= row < 32 and 0 <= dest < 7):
+            raise ValueError('Move can not be packed: ' + str(moves[a - 1]))
+        value = (kind << 11) | (col << 8) | (row << 3) | dest
+        data += value.to_bytes(2, 'big')
+    return bytes(data)
+
+## @brief Unpacks a move sequence from bytes.
+# @param data Packed moves
+# @return Array of moves
+def unpack_moves(data):
+    if len(data) % 2 != 0:
+        raise ValueError('Packed moves are truncated')
+    moves = []
+    for a in range(0, len(data), 2):
+        value = int.from_bytes(data[a:a + 2], 'big')
+        kind = value >> 11
+        col = (value >> 8) & 0x7
+        row = (value >> 3) & 0x1F
+        dest = value & 0x7
+        if kind > COLLECT or col >= 7 or dest >= 7 \
+                or (kind == STOCK and row == 0):
+            raise ValueError('Packed move is invalid: ' + hex(value))
+        if kind == STOCK:
+            moves.extend([(STOCK, 0, 0, 0)] * row)
+        else:
+            moves.append((kind, col, row, dest))
+    return moves
+
+## @brief Checks if moving a card to the foundation can never be a mistake.
+# @param card_idx Card index
+# @param found Foundation array
+# @return True if no other card could need the card in the tableau
+def _is_safe_found(card_idx, found):
+    rank = rules.CARD_RANKS[card_idx]
+    if rank <= 1:
+        return True
+    # Both opposite color cards of the rank below must be in the foundation
+    for suit in range(rules.SUIT_COUNT):
+        if rules.CARD_COLORS[suit * rules.RANK_COUNT] \
+                != rules.CARD_COLORS[card_idx]:
+            if found[suit] < 0 or rules.CARD_RANKS[found[suit]] < rank - 1:
+                return False
+    return True
+
+## @brief Gets the moves worth trying from a state, best moves first.
+# @param state Game state
+# @return Array of moves
+def get_moves(state):
+    tableau, hidden, stock, stock_idx, found = state
+    can_found = rules.CAN_FOUND
+    can_stack = rules.CAN_STACK
+    suits = rules.CARD_SUITS
+    found_moves = []
+    reveal_moves = []
+    stock_moves = []
+    other_moves = []
+    # First empty tableau column (only one is tried since they are the same)
+    empty_col = -1
+    for a in range(7):
+        if not tableau[a]:
+            empty_col = a
+            break
+    # Revealed stock card moves
+    if stock_idx >= 0:
+        card_idx = stock[stock_idx]
+        if can_found[card_idx][found[suits[card_idx]]]:
+            move = (STOCK_TO_FOUND, 0, 0, 0)
+            if _is_safe_found(card_idx, found):
+                return [move]
+            found_moves.append(move)
+        for a in range(7):
+            dest_idx = tableau[a][-1] if tableau[a] else rules.EMPTY
+            if (tableau[a] or a == empty_col) \
+                    and can_stack[card_idx][dest_idx]:
+                stock_moves.append((STOCK_TO_TABLEAU, 0, 0, a))
+    # Tableau card moves
+    for a in range(7):
+        col = tableau[a]
+        if not col:
+            continue
+        bottom = len(col) - 1
+        card_idx = col[bottom]
+        if can_found[card_idx][found[suits[card_idx]]]:
+            move = (TABLEAU_TO_FOUND, a, bottom, 0)
+            if _is_safe_found(card_idx, found):
+                return [move]
+            if bottom == hidden[a] and bottom > 0:
+                reveal_moves.append(move)
+            else:
+                found_moves.append(move)
+        for b in range(hidden[a], len(col)):
+            card_idx = col[b]
+            for c in range(7):
+                if c == a:
+                    continue
+                dest_idx = tableau[c][-1] if tableau[c] else rules.EMPTY
+                if not tableau[c] and c != empty_col:
+                    continue
+                if not can_stack[card_idx][dest_idx]:
+                    continue
+                move = (TABLEAU_TO_TABLEAU, a, b, c)
+                if b == hidden[a]:
+                    # Moving a king from an empty column gains nothing
+                    if b == 0 and not tableau[c]:
+                        continue
+                    if b > 0:
+                        reveal_moves.append(move)
+                    else:
+                        other_moves.append(move)
+                # Splitting a run is only useful if it frees a card for the
+                # foundation
+                elif can_found[col[b - 1]][found[suits[col[b - 1]]]]:
+                    other_moves.append(move)
+    # Columns with more flipped cards are revealed first
+    reveal_moves.sort(key=lambda move: -hidden[move[1]])
+    moves = found_moves + reveal_moves + stock_moves + other_moves
+    if stock:
+        moves.append((STOCK, 0, 0, 0))
+    return moves
+
+## @brief Applies a move to a state.
+# @param state Game state
+# @param move Move array
+# @return New game state
+def apply_move(state, move):
+    tableau, hidden, stock, stock_idx, found = state
+    kind, col, row, dest = move
+    if kind == STOCK:
+        stock_idx += 1
+        # Resets the stock pile if all cards were revealed
+        if stock_idx >= len(stock):
+            stock_idx = -1
+        return (tableau, hidden, stock, stock_idx, found)
+    if kind == COLLECT:
+        return (((),) * 7, (0,) * 7, (), -1, WON_FOUND)
+    tableau = list(tableau)
+    if kind == STOCK_TO_FOUND or kind == STOCK_TO_TABLEAU:
+        card_idxs = (stock[stock_idx],)
+        stock = stock[:stock_idx] + stock[stock_idx + 1:]
+        stock_idx -= 1
+    else:
+        card_idxs = tableau[col][row:]
+        tableau[col] = tableau[col][:row]
+        # Flips the next card in the column
+        if hidden[col] >= row and row > 0:
+            hidden = hidden[:col] + (row - 1,) + hidden[col + 1:]
+    if kind == STOCK_TO_FOUND or kind == TABLEAU_TO_FOUND:
+        suit = rules.CARD_SUITS[card_idxs[0]]
+        found = found[:suit] + (card_idxs[0],) + found[suit + 1:]
+    else:
+        tableau[dest] = tableau[dest] + card_idxs
+    return (tuple(tableau), hidden, stock, stock_idx, found)
+
+## @class LocalTable
+# @brief Transposition table of visited states for a single process.
+class LocalTable:
+    ## @return LocalTable object
+    def __init__(self):
+        ## @brief Set of visited state hashes
+        # @hideinitializer
+        self.__visited = set()
+
+    ## @brief Adds a state hash to the table.
+    # @param key_hash State hash
+    # @return True if the state was not visited before
+    def add(self, key_hash):
+        if key_hash in self.__visited:
+            return False
+        self.__visited.add(key_hash)
+        return True
+
+## @class SharedTable
+# @brief Transposition table of visited states shared between processes.
+#
+# The table is an open addressing hash table of 64 bit state hashes in shared
+# memory. It is lock-free: workers may race on the same slot, which can only
+# lose an entry and cause a state to be searched twice. The low byte of each
+# entry holds the generation it was added in, so the table can be reused for
+# a new search by starting a new generation instead of clearing it.
+class SharedTable:
+    ## @param size Number of slots (rounded up to a power of two), or None
+    # to attach to an existing table
+    # @param name Name of an existing table to attach to
+    # @return SharedTable object
+    def __init__(self, size=1 << 22, name=None):
+        if name is None:
+            slots = 1
+            while slots < size:
+                slots *= 2
+            ## @brief Shared memory block holding the table
+            # @hideinitializer
+            self.__memory = shm.SharedMemory(create=True, size=slots * 8)
+            self.__memory.buf[:] = bytes(slots * 8)
+            ## @brief The table created the shared memory block if true
+            # @hideinitializer
+            self.__owner = True
+        else:
+            self.__memory = shm.SharedMemory(name=name)
+            self.__owner = False
+        ## @brief Table slots
+        # @hideinitializer
+        self.__slots = self.__memory.buf.cast('Q')
+        ## @brief Mask used to get a slot index from a hash
+        # @hideinitializer
+        self.__mask = len(self.__slots) - 1
+        ## @brief Number of slots probed before an entry is replaced
+        # @hideinitializer
+        self.__probes = 8
+        ## @brief Name of the shared memory block
+        self.name = self.__memory.name
+        ## @brief Generation of the current search (1 to 255), which must be
+        # the same in every process using the table
+        self.generation = 1
+
+    ## @brief Adds a state hash to the table.
+    # @param key_hash Non-zero state hash
+    # @return True if the state was not visited before
+    def add(self, key_hash):
+        slots = self.__slots
+        idx = key_hash & self.__mask
+        entry = (key_hash & ~0xFF) | self.generation
+        for a in range(self.__probes):
+            slot = slots[(idx + a) & self.__mask]
+            if slot == entry:
+                return False
+            # Entries of earlier generations are free slots
+            if slot & 0xFF != self.generation:
+                slots[(idx + a) & self.__mask] = entry
+                return True
+        # Replaces an entry if the probed slots are full
+        slots[idx] = entry
+        return True
+
+    ## @brief Starts a new generation, which empties the table for a new
+    # search.
+    # @return None
+    def clear(self):
+        self.generation += 1
+        # Clearing the slots once the generations run out
+        if self.generation > 0xFF:
+            self.__memory.buf[:] = bytes(len(self.__memory.buf))
+            self.generation = 1
+
+    ## @brief Detaches from the table and frees it if this table created it.
+    # @return None
+    def close(self):
+        self.__slots.release()
+        self.__memory.close()
+        if self.__owner:
+            self.__memory.unlink()
+
+## @class Solver
+# @brief Finds a winning move sequence for a game state.
+class Solver:
+    ## @param max_nodes Maximum number of states searched per solve, in total
+    # over every worker process
+    # @param time_limit Maximum time in seconds per solve (None for no limit)
+    # @return Solver object
+    def __init__(self, max_nodes=500000, time_limit=None):
+        ## @brief Maximum number of states searched per solve
+        # @hideinitializer
+        self.max_nodes = max_nodes
+        ## @brief Maximum time in seconds per solve
+        # @hideinitializer
+        self.time_limit = time_limit
+        ## @brief Number of states searched by the last solve
+        # @hideinitializer
+        self.nodes = 0
+        ## @brief Number of worker processes used by the last solve (1 if it
+        # was solved serially)
+        # @hideinitializer
+        self.workers = 1
+        ## @brief Number of nodes between checks for cancellation
+        # @hideinitializer
+        self.__check_interval = 1024
+        ## @brief Maximum depth the root is expanded to for worker subtrees
+        # @hideinitializer
+        self.__split_depth = 32
+        ## @brief Maximum number of states searched serially before the work
+        # is split between the worker processes
+        # @hideinitializer
+        self.__probe_nodes = 5000
+        ## @brief Time in seconds between checks on the worker processes
+        # @hideinitializer
+        self.__poll_interval = 0.05
+        ## @brief Array of worker processes (None if they aren't running)
+        # @hideinitializer
+        self.__processes = None
+        ## @brief Number of transposition table slots the workers were
+        # started with
+        # @hideinitializer
+        self.__table_size = 0
+        ## @brief Transposition table shared with the workers
+        # @hideinitializer
+        self.__table = None
+        ## @brief Queue of subtree tasks (None stops a worker)
+        # @hideinitializer
+        self.__tasks = None
+        ## @brief Queue of subtree results
+        # @hideinitializer
+        self.__results = None
+        ## @brief Event that stops the workers' current search when set
+        # @hideinitializer
+        self.__cancel = None
+        ## @brief Shared number of states searched by every worker
+        # @hideinitializer
+        self.__node_count = None
+
+    ## @brief Searches for a winning move sequence.
+    # @param state Game state
+    # @param table Transposition table (a new LocalTable if None)
+    # @param cancel Event that stops the search when set
+    # @param end_time Value of time.monotonic() the search must stop at (None
+    # to use the time limit)
+    # @param node_count Shared value of the number of states searched by
+    # every process, which max_nodes limits instead of the states of this
+    # search (None for no shared count)
+    # @return Array of moves, or None if no solution was found
+    def solve(self, state, table=None, cancel=None, end_time=None,
+              node_count=None):
+        if table is None:
+            table = LocalTable()
+        self.nodes = 0
+        self.workers = 1
+        if is_won(state):
+            return []
+        if end_time is None and self.time_limit is not None:
+            end_time = time.monotonic() + self.time_limit
+        moves = self.__search(state, table, cancel, end_time, node_count)
+        # Adding the nodes searched since the last check
+        if node_count is not None:
+            with node_count.get_lock():
+                node_count.value += self.nodes % self.__check_interval
+        return moves
+
+    ## @brief Searches the tree below a state depth first.
+    # @param state Game state
+    # @param table Transposition table
+    # @param cancel Event that stops the search when set
+    # @param end_time Value of time.monotonic() the search must stop at
+    # @param node_count Shared value of the number of states searched by
+    # every process
+    # @return Array of moves, or None if no solution was found
+    def __search(self, state, table, cancel, end_time, node_count):
+        table.add(get_hash(state))
+        path = []
+        states = [state]
+        move_stack = [iter(get_moves(state))]
+        while move_stack:
+            move = next(move_stack[-1], None)
+            if move is None:
+                move_stack.pop()
+                states.pop()
+                if path:
+                    path.pop()
+                continue
+            new_state = apply_move(states[-1], move)
+            if is_won(new_state):
+                return path + [move]
+            if not table.add(get_hash(new_state)):
+                continue
+            self.nodes += 1
+            if self.nodes >= self.max_nodes:
+                return None
+            if self.nodes % self.__check_interval == 0:
+                if self.__is_stopped(cancel, end_time, node_count):
+                    return None
+            path.append(move)
+            states.append(new_state)
+            move_stack.append(iter(get_moves(new_state)))
+        return None
+
+    ## @brief Checks if a search must stop.
+    # @param cancel Event that stops the search when set
+    # @param end_time Value of time.monotonic() the search must stop at
+    # @param node_count Shared value of the number of states searched by
+    # every process
+    # @return True if the search is cancelled or out of time or nodes
+    def __is_stopped(self, cancel, end_time, node_count):
+        if cancel is not None and cancel.is_set():
+            return True
+        if end_time is not None and time.monotonic() > end_time:
+            return True
+        if node_count is not None:
+            with node_count.get_lock():
+                node_count.value += self.__check_interval
+                total = node_count.value
+            if total >= self.max_nodes:
+                # The other workers share the same budget
+                if cancel is not None:
+                    cancel.set()
+                return True
+        return False
+
+    ## @brief Searches for a winning move sequence using worker processes.
+    #
+    # A short serial search runs first, since it solves easy games faster
+    # than splitting the work would. Otherwise the moves near the root are
+    # split into subtrees that the workers take from a shared queue, so idle
+    # workers pick up the remaining subtrees. The workers share a
+    # transposition table, the time limit and the node budget, and all stop
+    # once one of them finds a solution. The workers keep running between
+    # solves until close() is called.
+    # @param state Game state
+    # @param workers Number of worker processes
+    # @param table_size Number of transposition table slots
+    # @return Array of moves, or None if no solution was found
+    def solve_parallel(self, state, workers=None, table_size=1 << 22):
+        # Workers beyond the number of CPUs only compete for the same CPUs
+        if workers is None or workers > mp.cpu_count():
+            workers = mp.cpu_count()
+        if workers <= 1 or is_won(state):
+            return self.solve(state)
+        end_time = None
+        if self.time_limit is not None:
+            end_time = time.monotonic() + self.time_limit
+        probe = Solver(min(self.__probe_nodes, self.max_nodes))
+        moves = probe.solve(state, end_time=end_time)
+        self.nodes = probe.nodes
+        self.workers = 1
+        # The probe found a solution, searched every state, ran out of time
+        # or used up the whole budget
+        if moves is not None or probe.nodes < probe.max_nodes \
+                or probe.nodes >= self.max_nodes:
+            return moves
+        self.__start_workers(workers, table_size)
+        self.__table.clear()
+        self.__cancel.clear()
+        self.workers = workers
+        node_count = self.__node_count
+        node_count.value = probe.nodes
+        # Splitting the root until there is a subtree for every worker
+        prefixes = self.__split_root(state, self.__table, workers)
+        for prefix in prefixes:
+            if is_won(prefix[0]):
+                return prefix[1]
+        for prefix in prefixes:
+            self.__tasks.put((state, prefix[1], self.__table.generation,
+                              end_time, self.max_nodes))
+        solution = self.__wait_for_workers(len(prefixes), end_time)
+        self.nodes = node_count.value
+        return solution
+
+    ## @brief Starts the worker processes if they aren't running with the
+    # same settings.
+    # @param workers Number of worker processes
+    # @param table_size Number of transposition table slots
+    # @return None
+    def __start_workers(self, workers, table_size):
+        if self.__processes is not None:
+            if len(self.__processes) == workers \
+                    and self.__table_size == table_size:
+                return
+            self.close()
+        self.__table = SharedTable(table_size)
+        self.__table_size = table_size
+        self.__tasks = mp.Queue()
+        self.__results = mp.Queue()
+        self.__cancel = mp.Event()
+        self.__node_count = mp.Value('q', 0)
+        self.__processes = []
+        for a in range(workers):
+            process = mp.Process(target=_solve_worker,
+                                 args=(self.__table.name, self.__tasks,
+                                       self.__results, self.__cancel,
+                                       self.__node_count),
+                                 daemon=True)
+            process.start()
+            self.__processes.append(process)
+
+    ## @brief Waits for the results of the subtree tasks.
+    #
+    # The results of the remaining tasks are still collected after a
+    # solution is found, so the workers are idle for the next solve.
+    # @param pending Number of subtree tasks
+    # @param end_time Value of time.monotonic() the search must stop at
+    # @return Array of moves, or None if no solution was found
+    def __wait_for_workers(self, pending, end_time):
+        solution = None
+        while pending > 0:
+            try:
+                moves = self.__results.get(timeout=self.__poll_interval)
+            except queue.Empty:
+                # A killed worker never sends the result of its task
+                if not all(process.is_alive()
+                           for process in self.__processes):
+                    self.close()
+                    break
+                if end_time is not None and time.monotonic() > end_time:
+                    self.__cancel.set()
+                continue
+            pending -= 1
+            if moves is not None and solution is None:
+                solution = moves
+                self.__cancel.set()
+        return solution
+
+    ## @brief Stops the worker processes and frees the transposition table.
+    # @return None
+    def close(self):
+        if self.__processes is None:
+            return
+        self.__cancel.set()
+        for process in self.__processes:
+            self.__tasks.put(None)
+        for process in self.__processes:
+            process.join(1)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        # Stopped workers may have left tasks in the queue
+        self.__tasks.cancel_join_thread()
+        self.__table.close()
+        self.__processes = None
+        self.__table = None
+
+    ## @brief Expands the search tree until there are enough subtrees.
+    # @param state Game state
+    # @param table Transposition table
+    # @param count Number of subtrees wanted
+    # @return Array of (state, moves) subtree roots, best subtrees first
+    def __split_root(self, state, table, count):
+        table.add(get_hash(state))
+        prefixes = [(state, [])]
+        # Forced moves don't split the tree, so the depth is limited
+        depth = 0
+        while len(prefixes) < count and depth < self.__split_depth:
+            depth += 1
+            expanded = []
+            for prefix in prefixes:
+                for move in get_moves(prefix[0]):
+                    new_state = apply_move(prefix[0], move)
+                    if is_won(new_state) or table.add(get_hash(new_state)):
+                        expanded.append((new_state, prefix[1] + [move]))
+            if not expanded:
+                break
+            prefixes = expanded
+        return prefixes
+
+## @brief Solves subtrees taken from the task queue (worker process target).
+#
+# The worker keeps running between solves until it takes None from the
+# queue.
+# @param table_name Name of the shared transposition table
+# @param tasks Queue of (root state, move prefix, table generation, end time,
+# maximum nodes) tasks
+# @param results Queue of move results (None if a subtree wasn't solved)
+# @param cancel Event that stops the search when set
+# @param node_count Shared value of the number of states searched by every
+# worker
+# @return None
+def _solve_worker(table_name, tasks, results, cancel, node_count):
+    table = SharedTable(name=table_name)
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            state, prefix, generation, end_time, max_nodes = task
+            table.generation = generation
+            moves = None
+            # Tasks left over after a solution was found are skipped
+            if not cancel.is_set():
+                solver = Solver(max_nodes)
+                moves = solver.solve(replay(state, prefix), table,
+                                     cancel, end_time, node_count)
+                if moves is not None:
+                    moves = prefix + moves
+            results.put(moves)
+    finally:
+        table.close()
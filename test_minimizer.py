@@ -0,0 +1,21 @@
+## @file test_minimizer.py
+# @brief Tests the solution minimizer.
+
+import unittest
+import minimizer
+import solver
+
+## @class TestMinimizer
+# @brief Tests shortening solver solutions.
+class TestMinimizer(unittest.TestCase):
+    ## @brief Checks that a shortened solution still wins.
+    # @return None
+    def test_minimize_wins(self):
+        state = solver.deal(0)
+        moves = solver.Solver().solve(state)
+        short_moves = minimizer.minimize(state, moves, 0.2)
+        self.assertLessEqual(len(short_moves), len(moves))
+        self.assertTrue(solver.is_won(solver.replay(state, short_moves)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+## @file test_snapshot.py
+# @brief Tests packing and unpacking game snapshots.
+
+import unittest
+import rules
+import snapshot
+import solver
+
+## @brief Creates a snapshot of a solver game state.
+# @param state Solver game state
+# @return Snapshot object
+def get_snapshot(state):
+    tableau, hidden, stock, stock_idx, found = state
+    snap = snapshot.Snapshot()
+    snap.tableau = [list(col) for col in tableau]
+    snap.hidden = list(hidden)
+    snap.stock = list(stock)
+    snap.stock_idx = stock_idx
+    for a in range(rules.SUIT_COUNT):
+        if found[a] >= 0:
+            snap.found_suits[a] = a
+            snap.found_ranks[a] = rules.CARD_RANKS[found[a]]
+    return snap
+
+## @class TestSnapshot
+# @brief Tests the snapshot format.
+class TestSnapshot(unittest.TestCase):
+    ## @brief Checks that snapshots along a game unpack to the same game.
+    # @return None
+    def test_round_trip(self):
+        state = solver.deal(0)
+        moves = solver.Solver().solve(state)
+        for move in moves[:-1]:
+            state = solver.apply_move(state, move)
+            snap = get_snapshot(state)
+            snap.moves = 65535
+            snap.score = -120
+            snap.time = 12.3
+            data = snap.pack()
+            self.assertLessEqual(len(data), 60)
+            new_snap = snapshot.Snapshot.unpack(data)
+            self.assertEqual(new_snap.pack(), data)
+            self.assertEqual(vars(new_snap), vars(snap))
+
+    ## @brief Checks that values that don't fit the format are rejected.
+    # @return None
+    def test_pack_rejects_overflow(self):
+        for name, value in (('moves', 65536), ('moves', -1),
+                            ('score', 32768), ('score', -32769),
+                            ('time', -1)):
+            snap = get_snapshot(solver.deal(0))
+            setattr(snap, name, value)
+            with self.assertRaises(ValueError):
+                snap.pack()
+
+    ## @brief Checks that invalid snapshot bytes are rejected.
+    # @return None
+    def test_unpack_rejects_invalid(self):
+        data = get_snapshot(solver.deal(0)).pack()
+        with self.assertRaises(ValueError):
+            snapshot.Snapshot.unpack(data[:-4])
+        with self.assertRaises(ValueError):
+            snapshot.Snapshot.unpack(bytes([snapshot.VERSION + 1]) + data[1:])
+        # Storing the same card twice
+        snap = get_snapshot(solver.deal(0))
+        snap.stock[0] = snap.stock[1]
+        with self.assertRaises(ValueError):
+            snap.pack()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,238 @@
+## @file test_solver.py
+# @brief Tests the solver rules, packed moves, transposition tables and
+# searches.
+
+import time
+import unittest
+import unittest.mock as mock
+import rules
+import solver
+
+## @class TestRules
+# @brief Tests the solver game rules.
+class TestRules(unittest.TestCase):
+    ## @brief Checks that the moves worth trying are legal.
+    # @return None
+    def test_get_moves_legal(self):
+        for seed in range(5):
+            state = solver.deal(seed)
+            for move in solver.get_moves(state):
+                self.assertTrue(solver.is_legal(state, move))
+
+    ## @brief Checks that illegal moves are rejected.
+    # @return None
+    def test_is_legal_rejects(self):
+        state = solver.deal(0)
+        # No stock card is revealed and not every card is revealed
+        self.assertFalse(solver.is_legal(state,
+                                         (solver.STOCK_TO_FOUND, 0, 0, 0)))
+        self.assertFalse(solver.is_legal(state, (solver.COLLECT, 0, 0, 0)))
+        # Flipped cards and moves onto the same column can't be moved
+        self.assertFalse(solver.is_legal(
+            state, (solver.TABLEAU_TO_TABLEAU, 6, 0, 1)))
+        self.assertFalse(solver.is_legal(
+            state, (solver.TABLEAU_TO_TABLEAU, 1, 1, 1)))
+        self.assertIsNone(solver.replay(state,
+                                        [(solver.COLLECT, 0, 0, 0)]))
+
+    ## @brief Checks that the stock cycles back to no revealed card.
+    # @return None
+    def test_stock_cycle(self):
+        state = solver.deal(0)
+        stock_length = len(state[2])
+        for a in range(stock_length):
+            state = solver.apply_move(state, (solver.STOCK, 0, 0, 0))
+            self.assertEqual(state[3], a)
+        state = solver.apply_move(state, (solver.STOCK, 0, 0, 0))
+        self.assertEqual(state[3], -1)
+
+    ## @brief Checks that moving the revealed card of a column flips the card
+    # above it.
+    # @return None
+    def test_apply_move_flips(self):
+        for seed in range(20):
+            state = solver.deal(seed)
+            for move in solver.get_moves(state):
+                kind, col, row, dest = move
+                if kind == solver.TABLEAU_TO_TABLEAU and row > 0:
+                    new_state = solver.apply_move(state, move)
+                    self.assertEqual(new_state[1][col], row - 1)
+                    self.assertEqual(new_state[0][dest][-1],
+                                     state[0][col][row])
+                    return
+        self.fail('No deal had a tableau move')
+
+    ## @brief Checks that a won game can be collected into a won state.
+    # @return None
+    def test_collect(self):
+        state = (((),) * 7, (0,) * 7, (), -1, (rules.EMPTY,) * 4)
+        self.assertTrue(solver.can_collect(state))
+        self.assertTrue(solver.is_won(
+            solver.apply_move(state, (solver.COLLECT, 0, 0, 0))))
+
+## @class TestPackedMoves
+# @brief Tests packing move sequences into bytes.
+class TestPackedMoves(unittest.TestCase):
+    ## @brief Checks that packed moves unpack to the same moves.
+    # @return None
+    def test_pack_round_trip(self):
+        for seed in range(3):
+            state = solver.deal(seed)
+            moves = solver.Solver().solve(state)
+            data = solver.pack_moves(moves)
+            self.assertEqual(solver.unpack_moves(data), moves)
+            self.assertTrue(solver.is_won(solver.replay(state, data)))
+
+    ## @brief Checks that long runs of stock moves are split.
+    # @return None
+    def test_pack_stock_runs(self):
+        moves = [(solver.STOCK, 0, 0, 0)] * 40
+        data = solver.pack_moves(moves)
+        self.assertEqual(len(data), 4)
+        self.assertEqual(solver.unpack_moves(data), moves)
+
+    ## @brief Checks that moves outside the packed format are rejected.
+    # @return None
+    def test_pack_rejects_invalid(self):
+        with self.assertRaises(ValueError):
+            solver.pack_moves([(solver.TABLEAU_TO_TABLEAU, 0, 32, 1)])
+        with self.assertRaises(ValueError):
+            solver.pack_moves([(solver.TABLEAU_TO_TABLEAU, 7, 0, 1)])
+
+    ## @brief Checks that invalid packed data is rejected.
+    # @return None
+    def test_unpack_rejects_invalid(self):
+        with self.assertRaises(ValueError):
+            solver.unpack_moves(b'\x00')
+        with self.assertRaises(ValueError):
+            solver.unpack_moves(b'\xf0\x00')
+        # Stock run of length zero
+        with self.assertRaises(ValueError):
+            solver.unpack_moves(b'\x00\x00')
+
+## @class TestSharedTable
+# @brief Tests the transposition table shared between processes.
+class TestSharedTable(unittest.TestCase):
+    ## @brief Checks that added hashes are found by attached tables.
+    # @return None
+    def test_add(self):
+        table = solver.SharedTable(1 << 10)
+        other = solver.SharedTable(name = table.name)
+        try:
+            self.assertTrue(table.add(12345 << 8))
+            self.assertFalse(table.add(12345 << 8))
+            self.assertFalse(other.add(12345 << 8))
+            self.assertTrue(other.add(54321 << 8))
+        finally:
+            other.close()
+            table.close()
+
+    ## @brief Checks that clearing the table forgets the added hashes.
+    # @return None
+    def test_clear(self):
+        table = solver.SharedTable(1 << 10)
+        try:
+            table.add(12345 << 8)
+            table.clear()
+            self.assertEqual(table.generation, 2)
+            self.assertTrue(table.add(12345 << 8))
+            self.assertFalse(table.add(12345 << 8))
+        finally:
+            table.close()
+
+    ## @brief Checks that the slots are zeroed once the generations run out.
+    # @return None
+    def test_clear_wraps(self):
+        table = solver.SharedTable(1 << 10)
+        try:
+            table.add(12345 << 8)
+            table.generation = 0xFF
+            table.clear()
+            # The entry of generation 1 would still match if the slots
+            # weren't zeroed
+            self.assertEqual(table.generation, 1)
+            self.assertTrue(table.add(12345 << 8))
+        finally:
+            table.close()
+
+## @class TestSolver
+# @brief Tests the serial and parallel searches.
+class TestSolver(unittest.TestCase):
+    ## @brief Checks that serial solutions replay to a win.
+    # @return None
+    def test_solve(self):
+        for seed in range(3):
+            state = solver.deal(seed)
+            moves = solver.Solver().solve(state)
+            self.assertTrue(solver.is_won(solver.replay(state, moves)))
+
+    ## @brief Checks that the node budget stops a serial search.
+    # @return None
+    def test_solve_budget(self):
+        game_solver = solver.Solver(1000)
+        self.assertIsNone(game_solver.solve(solver.deal(25)))
+        self.assertEqual(game_solver.nodes, 1000)
+
+    ## @brief Checks that parallel solutions replay to a win, including after
+    # the table is reused and the workers are restarted.
+    # @return None
+    def test_solve_parallel(self):
+        game_solver = solver.Solver()
+        state = solver.deal(5)
+        # Uses the workers even on hosts with fewer CPUs
+        with mock.patch.object(solver.mp, 'cpu_count', return_value = 2):
+            try:
+                for a in range(2):
+                    moves = game_solver.solve_parallel(state, 2, 1 << 16)
+                    self.assertEqual(game_solver.workers, 2)
+                    self.assertTrue(solver.is_won(solver.replay(state,
+                                                                moves)))
+                game_solver.close()
+                moves = game_solver.solve_parallel(state, 2, 1 << 16)
+                self.assertTrue(solver.is_won(solver.replay(state, moves)))
+            finally:
+                game_solver.close()
+
+    ## @brief Checks that an easy deal is solved without the workers.
+    # @return None
+    def test_solve_parallel_probe(self):
+        game_solver = solver.Solver()
+        with mock.patch.object(solver.mp, 'cpu_count', return_value = 2):
+            try:
+                moves = game_solver.solve_parallel(solver.deal(0), 2)
+            finally:
+                game_solver.close()
+        self.assertEqual(game_solver.workers, 1)
+        self.assertTrue(solver.is_won(solver.replay(solver.deal(0), moves)))
+
+    ## @brief Checks that the node budget covers every worker.
+    # @return None
+    def test_solve_parallel_budget(self):
+        game_solver = solver.Solver(20000)
+        with mock.patch.object(solver.mp, 'cpu_count', return_value = 2):
+            try:
+                moves = game_solver.solve_parallel(solver.deal(25), 2,
+                                                   1 << 16)
+            finally:
+                game_solver.close()
+        self.assertIsNone(moves)
+        # Workers only add their nodes every check interval
+        self.assertLess(game_solver.nodes, 20000 + 2 * 1024)
+
+    ## @brief Checks that the time limit covers the whole parallel search.
+    # @return None
+    def test_solve_parallel_deadline(self):
+        game_solver = solver.Solver(10 ** 9, time_limit = 0.5)
+        with mock.patch.object(solver.mp, 'cpu_count', return_value = 2):
+            try:
+                start = time.perf_counter()
+                moves = game_solver.solve_parallel(solver.deal(25), 2,
+                                                   1 << 16)
+                seconds = time.perf_counter() - start
+            finally:
+                game_solver.close()
+        self.assertIsNone(moves)
+        self.assertLess(seconds, 1.5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,382 @@
+## @file tournament.py
+# @brief Compares agent policies on the same seeded deals.
+#
+# Every policy plays every deal headlessly in a pool of worker processes,
+# with a time limit and an optional memory limit per game. The results are
+# cached per (policy version, run settings, deal), so a re-run only plays the
+# games of new deals, changed policies or changed settings.
+
+import argparse
+import importlib
+import json
+import math
+import multiprocessing as mp
+import os
+import signal
+import statistics
+import time
+import rules
+import solver
+
+try:
+    import resource
+except ImportError:
+    # Memory limits are only supported on Unix
+    resource = None
+
+## @class GreedyPolicy
+# @brief Plays the best looking move that doesn't repeat a state.
+class GreedyPolicy:
+    ## @brief Policy version, which must change whenever the play changes
+    version = '1'
+
+    ## @return GreedyPolicy object
+    def __init__(self):
+        ## @brief Set of visited state keys in the current game
+        # @hideinitializer
+        self.__visited = set()
+
+    ## @brief Starts a new game.
+    # @param state Game state of the deal
+    # @return None
+    def start(self, state):
+        self.__visited = {solver.get_key(state)}
+
+    ## @brief Chooses the next move.
+    # @param state Game state
+    # @return Move array, or None to give up
+    def choose_move(self, state):
+        for move in solver.get_moves(state):
+            key = solver.get_key(solver.apply_move(state, move))
+            if key not in self.__visited:
+                self.__visited.add(key)
+                return move
+        return None
+
+## @class SolverPolicy
+# @brief Plays the moves of a solution found at the start of the game.
+class SolverPolicy:
+    ## @brief Policy version, which must change whenever the play changes
+    version = '1'
+
+    ## @return SolverPolicy object
+    def __init__(self):
+        ## @brief Solver used at the start of each game
+        # @hideinitializer
+        self.__solver = solver.Solver(max_nodes = 200000)
+        ## @brief Array of solution moves left to play
+        # @hideinitializer
+        self.__moves = []
+
+    ## @brief Starts a new game.
+    # @param state Game state of the deal
+    # @return None
+    def start(self, state):
+        moves = self.__solver.solve(state)
+        self.__moves = [] if moves is None else moves
+
+    ## @brief Chooses the next move.
+    # @param state Game state
+    # @return Move array, or None to give up
+    def choose_move(self, state):
+        if not self.__moves:
+            return None
+        return self.__moves.pop(0)
+
+## @brief Built in policies by name
+POLICIES = {
+    'greedy': GreedyPolicy,
+    'solver': SolverPolicy,
+}
+
+## @brief Gets a policy class.
+# @param name Built in policy name, or 'module:Class' for any other policy
+# (such as a learned policy) with the same start and choose_move methods
+# @return Policy class
+def get_policy(name):
+    if name in POLICIES:
+        return POLICIES[name]
+    module_name, _, class_name = name.partition(':')
+    return getattr(importlib.import_module(module_name), class_name)
+
+## @class GameTimeout
+# @brief Raised when a game runs out of time.
+class GameTimeout(Exception):
+    pass
+
+## @brief Raises GameTimeout (signal handler).
+# @param signum Signal number
+# @param frame Current stack frame
+# @return None
+def _raise_timeout(signum, frame):
+    raise GameTimeout()
+
+## @brief Result statuses of games stopped by a resource limit, which are
+# played again instead of being cached
+LIMIT_STATUSES = ('timeout', 'memory')
+
+## @brief Creates the result of a game that hasn't made any moves.
+# @param status Result status
+# @return Result dictionary
+def _new_result(status):
+    return {'won': False, 'moves': 0, 'found_cards': 0,
+            'start_seconds': 0.0, 'seconds': 0.0, 'status': status}
+
+## @brief Plays a game with a policy.
+#
+# The time the policy takes to start the game is recorded separately from
+# the time it takes to choose the moves.
+# @param policy Policy object
+# @param seed Deal seed
+# @param max_moves Maximum number of moves before the game is stopped
+# @return Result dictionary
+def play_game(policy, seed, max_moves):
+    state = solver.deal(seed)
+    result = _new_result('stuck')
+    start = time.perf_counter()
+    # Time the first move was chosen at (None while the policy is starting)
+    move_start = None
+    try:
+        policy.start(state)
+        move_start = time.perf_counter()
+        while result['moves'] < max_moves:
+            move = policy.choose_move(state)
+            if move is None or not solver.is_legal(state, move):
+                break
+            state = solver.apply_move(state, move)
+            result['moves'] += 1
+            if solver.is_won(state):
+                result['won'] = True
+                result['status'] = 'won'
+                break
+        else:
+            result['status'] = 'max_moves'
+    except GameTimeout:
+        result['status'] = 'timeout'
+    except MemoryError:
+        result['status'] = 'memory'
+    end = time.perf_counter()
+    if move_start is None:
+        result['start_seconds'] = end - start
+    else:
+        result['start_seconds'] = move_start - start
+        result['seconds'] = end - move_start
+    # Number of cards that reached the foundation
+    for card_idx in state[4]:
+        if card_idx >= 0:
+            result['found_cards'] += rules.CARD_RANKS[card_idx] + 1
+    return result
+
+## @brief Sets the resource limits of a worker process.
+# @param memory_limit Maximum memory in megabytes (None for no limit)
+# @return None
+def _init_worker(memory_limit):
+    if memory_limit is not None and resource is not None:
+        limit = memory_limit * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+## @brief Plays one game (worker process target).
+# @param task (policy name, seed, max moves, timeout) task array
+# @return (policy name, seed, result dictionary) array
+def _play_task(task):
+    policy_name, seed, max_moves, timeout = task
+    policy = get_policy(policy_name)()
+    # Timeouts are only supported where interval timers are
+    use_timer = timeout is not None and hasattr(signal, 'setitimer')
+    if use_timer:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    result = None
+    try:
+        try:
+            result = play_game(policy, seed, max_moves)
+        finally:
+            if use_timer:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+    except GameTimeout:
+        # The timer went off outside of the game loop, such as just after the
+        # game ended
+        if result is None:
+            result = _new_result('timeout')
+    return policy_name, seed, result
+
+## @brief Gets the path of a policy's result cache.
+# @param cache_dir Cache directory
+# @param policy_name Policy name
+# @param settings Array of the run settings the results depend on
+# @return Cache file path
+def _get_cache_path(cache_dir, policy_name, settings):
+    version = get_policy(policy_name).version
+    file_name = '-'.join([policy_name.replace(':', '.'), version]
+                         + [str(setting) for setting in settings])
+    return os.path.join(cache_dir, file_name + '.json')
+
+## @brief Loads the cached results of a policy.
+# @param cache_dir Cache directory
+# @param policy_name Policy name
+# @param settings Array of the run settings the results depend on
+# @return Dictionary of result dictionaries by seed
+def _load_cache(cache_dir, policy_name, settings):
+    path = _get_cache_path(cache_dir, policy_name, settings)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as cache_file:
+        return {int(seed): result
+                for seed, result in json.load(cache_file).items()}
+
+## @brief Saves the cached results of a policy.
+#
+# Games stopped by a resource limit aren't saved, since they may finish when
+# they are played again.
+# @param cache_dir Cache directory
+# @param policy_name Policy name
+# @param settings Array of the run settings the results depend on
+# @param results Dictionary of result dictionaries by seed
+# @return None
+def _save_cache(cache_dir, policy_name, settings, results):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _get_cache_path(cache_dir, policy_name, settings)
+    # Writing to a temporary file first so an interrupted run can't leave a
+    # broken cache
+    with open(path + '.tmp', 'w') as cache_file:
+        json.dump({str(seed): result for seed, result in results.items()
+                   if result['status'] not in LIMIT_STATUSES}, cache_file)
+    os.replace(path + '.tmp', path)
+
+## @brief Plays every policy on every deal.
+# @param policy_names Array of policy names
+# @param seeds Array of deal seeds
+# @param workers Number of worker processes
+# @param timeout Maximum time in seconds per game (None for no limit)
+# @param memory_limit Maximum memory in megabytes per game (None for no
+# limit)
+# @param max_moves Maximum number of moves per game
+# @param cache_dir Result cache directory (None to disable the cache)
+# @return Dictionary of arrays of result dictionaries by policy name
+def run_tournament(policy_names, seeds, workers=None, timeout=60,
+                   memory_limit=None, max_moves=1000, cache_dir=None):
+    results = {}
+    tasks = []
+    # Results are only reused for runs with the same settings
+    settings = (max_moves, None if timeout is None else float(timeout),
+                memory_limit)
+    for policy_name in policy_names:
+        cached = {}
+        if cache_dir is not None:
+            cached = _load_cache(cache_dir, policy_name, settings)
+        results[policy_name] = cached
+        # Only games that aren't cached are played
+        for seed in seeds:
+            if seed not in cached:
+                tasks.append((policy_name, seed, max_moves, timeout))
+    if tasks:
+        # Every game gets a new worker process, so memory used by one game
+        # can't count against the limit of the next
+        with mp.Pool(workers, initializer=_init_worker,
+                     initargs=(memory_limit,), maxtasksperchild=1) as pool:
+            try:
+                for policy_name, seed, result in pool.imap_unordered(
+                        _play_task, tasks):
+                    results[policy_name][seed] = result
+            finally:
+                if cache_dir is not None:
+                    for policy_name in policy_names:
+                        _save_cache(cache_dir, policy_name, settings,
+                                    results[policy_name])
+    return {policy_name: [results[policy_name][seed] for seed in seeds]
+            for policy_name in policy_names}
+
+## @brief Gets the mean and 95% confidence interval half width of values.
+# @param values Array of values
+# @return (mean, half width) array
+def get_mean_interval(values):
+    if not values:
+        return (0.0, 0.0)
+    mean = statistics.fmean(values)
+    if len(values) < 2:
+        return (mean, 0.0)
+    return (mean, 1.96 * statistics.stdev(values) / math.sqrt(len(values)))
+
+## @brief Gets the 95% Wilson score interval of a win rate.
+# @param wins Number of wins
+# @param games Number of games
+# @return (low, high) array
+def get_win_interval(wins, games):
+    if games == 0:
+        return (0.0, 0.0)
+    z = 1.96
+    rate = wins / games
+    center = (rate + z * z / (2 * games)) / (1 + z * z / games)
+    width = (z * math.sqrt(rate * (1 - rate) / games
+                           + z * z / (4 * games * games))
+             / (1 + z * z / games))
+    return (center - width, center + width)
+
+## @brief Gets the summary statistics of a policy's results.
+# @param results Array of result dictionaries
+# @return Dictionary of statistics
+def summarize(results):
+    wins = len([result for result in results if result['won']])
+    time_per_move = [result['seconds'] / result['moves']
+                     for result in results if result['moves'] > 0]
+    return {
+        'games': len(results),
+        'win_rate': wins / len(results) if results else 0.0,
+        'win_interval': get_win_interval(wins, len(results)),
+        'moves': get_mean_interval([result['moves'] for result in results]),
+        'found_cards': get_mean_interval([result['found_cards']
+                                          for result in results]),
+        'time_per_move': get_mean_interval(time_per_move),
+        'start_time': get_mean_interval([result['start_seconds']
+                                         for result in results]),
+        'timeouts': len([result for result in results
+                         if result['status'] == 'timeout']),
+    }
+
+## @brief Prints the summary statistics of every policy.
+# @param results Dictionary of arrays of result dictionaries by policy name
+# @return None
+def print_report(results):
+    print('%-12s %6s %22s %16s %14s %18s %20s %8s'
+          % ('policy', 'games', 'win rate (95% CI)', 'moves',
+             'found cards', 'ms per move', 'ms to start', 'timeouts'))
+    for policy_name, policy_results in results.items():
+        summary = summarize(policy_results)
+        low, high = summary['win_interval']
+        moves, moves_width = summary['moves']
+        found, found_width = summary['found_cards']
+        move_time, move_time_width = summary['time_per_move']
+        start_time, start_time_width = summary['start_time']
+        print('%-12s %6d %6.1f%% [%5.1f, %5.1f] %7.1f +- %5.1f'
+              ' %6.1f +- %4.1f %8.3f +- %6.3f %9.1f +- %7.1f %8d'
+              % (policy_name, summary['games'], 100 * summary['win_rate'],
+                 100 * low, 100 * high, moves, moves_width, found,
+                 found_width, 1000 * move_time, 1000 * move_time_width,
+                 1000 * start_time, 1000 * start_time_width,
+                 summary['timeouts']))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Compares agent policies on the same seeded deals.')
+    parser.add_argument('policies', nargs='+',
+                        help="policy names ('greedy', 'solver' or "
+                             "'module:Class')")
+    parser.add_argument('--deals', type=int, default=100,
+                        help='number of seeded deals')
+    parser.add_argument('--first-seed', type=int, default=0,
+                        help='seed of the first deal')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='number of worker processes')
+    parser.add_argument('--timeout', type=float, default=60,
+                        help='maximum time in seconds per game')
+    parser.add_argument('--memory', type=int, default=None,
+                        help='maximum memory in megabytes per game')
+    parser.add_argument('--max-moves', type=int, default=1000,
+                        help='maximum number of moves per game')
+    parser.add_argument('--cache-dir', default='.tournament',
+                        help='result cache directory')
+    args = parser.parse_args()
+    deal_seeds = range(args.first_seed, args.first_seed + args.deals)
+    print_report(run_tournament(args.policies, deal_seeds, args.workers,
+                                args.timeout, args.memory, args.max_moves,
+                                args.cache_dir))